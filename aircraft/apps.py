@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class AircraftConfig(AppConfig):
+    name = 'aircraft'
+
+    def ready(self):
+        from aircraft import signals  # noqa: F401
@@ -0,0 +1,95 @@
+# Core
+from collections import namedtuple
+
+# Django
+from django.core.cache import cache
+
+# Third-Party
+import numpy
+
+# App
+from aircraft.models import AircraftConversion
+
+# Applies an aircraft's unit conversions (AircraftConversion rows) to whole series
+# arrays. Each UnitConversion is linear, converted = a_param * value + b_param, which
+# covers °C↔°F, PPH↔GPH, kPa↔inHg and plain scale/offset corrections alike.
+
+# Conversions picked for these names apply to every series of the group
+GROUP_SERIES = {
+    'EGT (all cylinders)': 'EGT',
+    'CHT (all cylinders)': 'CHT',
+}
+
+# One conversion of a plan
+Step = namedtuple('Step', ['series_name', 'scale', 'offset', 'from_name', 'to_name'])
+
+
+def _cache_key(aircraft_id):
+    return 'conversion_plan:{}'.format(aircraft_id)
+
+
+class ConversionPlan():
+    """The conversions of one aircraft, compiled for applying them to series."""
+
+    def __init__(self, steps):
+        self.steps = {}
+        self.group_steps = []
+        for step in steps:
+            if step.series_name in GROUP_SERIES:
+                self.group_steps.append((GROUP_SERIES[step.series_name], step))
+            else:
+                self.steps[step.series_name] = step
+
+    def __bool__(self):
+        return bool(self.steps or self.group_steps)
+
+    def step_for(self, series_name):
+        """The Step converting series_name, or None; a conversion of the series itself wins over its group's."""
+        if series_name in self.steps:
+            return self.steps[series_name]
+        upper_name = series_name.upper()
+        for group, step in self.group_steps:
+            if group in upper_name:
+                return step
+        return None
+
+    def apply(self, series_name, values):
+        """
+        values (a sequence, memoryview or array of numbers) converted for series_name,
+        as a float64 array. Without a conversion that is values as an array, which
+        shares the memory of a float64 memoryview or array rather than copying it.
+        """
+        step = self.step_for(series_name)
+        if step is None:
+            return numpy.asarray(values, dtype=numpy.float64)
+        converted = numpy.array(values, dtype=numpy.float64)
+        converted *= step.scale
+        converted += step.offset
+        return converted
+
+    def apply_all(self, series):
+        """series, a dict of name to values, with every series that has a conversion converted."""
+        return {name: self.apply(name, values) for name, values in series.items()}
+
+
+def compile_plan(aircraft_id):
+    steps = [Step(series_name, a_param, b_param, from_name, to_name)
+             for series_name, a_param, b_param, from_name, to_name in
+             AircraftConversion.objects.filter(aircraft_id=aircraft_id).order_by('id').values_list(
+                 'series_name', 'unitconversion__a_param', 'unitconversion__b_param',
+                 'unitconversion__from_name', 'unitconversion__to_name')]
+    return ConversionPlan(steps)
+
+
+def conversion_plan(aircraft_id):
+    """The ConversionPlan of an aircraft, compiled once and cached until its conversions change."""
+    steps = cache.get(_cache_key(aircraft_id))
+    if steps is None:
+        plan = compile_plan(aircraft_id)
+        cache.set(_cache_key(aircraft_id), list(plan.steps.values()) + [step for _, step in plan.group_steps], None)
+        return plan
+    return ConversionPlan(steps)
+
+
+def invalidate_conversion_plan(aircraft_id):
+    cache.delete(_cache_key(aircraft_id))
@@ -0,0 +1,124 @@
+# Core
+import threading
+from collections import namedtuple
+
+# Django
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+# App
+from account.models import AnalysisPack, Subscription
+
+# A user's analysis packs: how many, how many have not expired and their remaining incidents
+PackSummary = namedtuple('PackSummary', ['packs', 'valid_packs', 'remaining_incidents'])
+
+# Bumped when a subscription or pack is written; an Entitlements loaded under an
+# older generation forgets what it loaded
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def running_subscriptions(now):
+    """The subscriptions running at now; an aircraft with one is paid for."""
+    return Subscription.objects.filter(start_date__lte=now, end_date__gte=now)
+
+
+def valid_packs(now):
+    """The analysis packs usable at now; a user with one has all their aircraft paid for."""
+    return AnalysisPack.objects.filter(expiration_date__gte=now, remaining_incidents__gt=0)
+
+
+def paid_condition(user_id, now):
+    """
+    Filter for the aircraft of user_id paid for at now: those with a running
+    subscription, or all of them when the user has a valid pack. It agrees with
+    Entitlements.current_subscription and oldest_valid_pack.
+    """
+    paid = Exists(running_subscriptions(now).filter(aircraft=OuterRef('pk')))
+
+    # If we have pack, then all aircraft are good.
+    if user_id is not None:
+        paid = paid | Exists(valid_packs(now).filter(user_id=user_id))
+    return paid
+
+
+class Entitlements():
+    """
+    Current subscriptions of aircraft and oldest valid packs of users, loaded for
+    many aircraft and users in one query each and kept for the length of a request
+    (see entitlements_for). The answers are those of Aircraft.current_subscription()
+    and User.oldest_valid_pack().
+    """
+
+    def __init__(self):
+        # Aircraft id to current subscription and user id to oldest valid pack, None when there is none
+        self.subscriptions = {}
+        self.packs = {}
+        self.generation = _generation
+
+    def clear(self):
+        self.subscriptions.clear()
+        self.packs.clear()
+
+    def _forget_stale(self):
+        if self.generation != _generation:
+            self.generation = _generation
+            self.clear()
+
+    def load(self, aircraft_ids=(), user_ids=()):
+        """Look up the subscriptions of aircraft_ids and packs of user_ids that are not known yet."""
+        self._forget_stale()
+        now = timezone.now()
+
+        aircraft_ids = set(aircraft_ids) - set(self.subscriptions)
+        if aircraft_ids:
+            subscriptions = dict.fromkeys(aircraft_ids)
+            # Latest started first, so the first one of an aircraft is its current subscription
+            for subscription in running_subscriptions(now).filter(aircraft_id__in=aircraft_ids) \
+                    .order_by('-start_date', '-id'):
+                if subscriptions[subscription.aircraft_id] is None:
+                    subscriptions[subscription.aircraft_id] = subscription
+            self.subscriptions.update(subscriptions)
+
+        user_ids = set(user_ids) - set(self.packs)
+        if user_ids:
+            packs = dict.fromkeys(user_ids)
+            for pack in valid_packs(now).filter(user_id__in=user_ids).order_by('id'):
+                if packs[pack.user_id] is None:
+                    packs[pack.user_id] = pack
+            self.packs.update(packs)
+
+    def current_subscription(self, aircraft):
+        self._forget_stale()
+        if aircraft.id not in self.subscriptions:
+            self.load(aircraft_ids=[aircraft.id])
+        return self.subscriptions[aircraft.id]
+
+    def oldest_valid_pack(self, user):
+        self._forget_stale()
+        if user.id not in self.packs:
+            self.load(user_ids=[user.id])
+        return self.packs[user.id]
+
+
+def entitlements_for(request):
+    """The Entitlements of request, shared by everything that handles it."""
+    if not hasattr(request, '_entitlements'):
+        request._entitlements = Entitlements()
+    return request._entitlements
+
+
+def invalidate_entitlements():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def pack_summary(user_id):
+    """The PackSummary of user_id, from one query over the user's packs."""
+    valid = Q(expiration_date__gte=timezone.now())
+    summary = AnalysisPack.objects.filter(user_id=user_id).aggregate(
+        packs=Count('id'),
+        valid_packs=Count('id', filter=valid),
+        remaining_incidents=Sum('remaining_incidents', filter=valid))
+    return PackSummary(**summary)
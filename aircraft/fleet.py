@@ -0,0 +1,53 @@
+# Core
+import time
+from collections import namedtuple
+
+# Django
+from django.core.cache import cache
+
+# App
+from aircraft.models import Aircraft
+
+# A user's aircraft, kept in the cache as one snapshot the aircraft forms and lists
+# read from. Snapshots are keyed by a per-user version, bumped by aircraft.signals
+# once a write to an aircraft of the user commits, so a snapshot computed before a
+# write can never be stored over the one after it. They hold no entitlements, which
+# end by themselves; paid_aircraft_for_user and Entitlements query those.
+
+# Seconds a snapshot is kept, so the fleets of users gone idle leave the cache
+FLEET_CACHE_TIMEOUT = 5 * 60
+
+FleetAircraft = namedtuple('FleetAircraft', ['id', 'registration_no', 'hidden'])
+
+
+def _version_key(user_id):
+    return 'fleet_version:{}'.format(user_id)
+
+
+def _fleet_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Started from the clock, so a version lost from the cache never reuses an old snapshot
+        cache.add(_version_key(user_id), int(time.time() * 1000), None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def user_fleet(user_id):
+    """FleetAircraft of every aircraft of user_id, hidden ones included, ordered by registration."""
+    key = 'fleet:{}:{}'.format(user_id, _fleet_version(user_id))
+    fleet = cache.get(key)
+    if fleet is None:
+        fleet = [FleetAircraft(*row) for row in
+                 Aircraft.objects.filter(user_id=user_id)
+                 .order_by('registration_no', 'id').values_list('id', 'registration_no', 'hidden')]
+        cache.set(key, fleet, FLEET_CACHE_TIMEOUT)
+    return fleet
+
+
+def invalidate_user_fleet(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # No version, so nothing was cached for the user
+        pass
@@ -0,0 +1,136 @@
+# Core
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Columnar storage of flight series: one contiguous float64 array per series, behind
+# a JSON index, so a reader maps the file and touches only the series it reads.
+#
+#   magic (4 bytes) | version (uint16) | reserved (uint16) | index length (uint64)
+#   index: {"byteorder": ..., "series": [{"name", "offset", "length"}, ...]}
+#   series arrays, each starting on an 8 byte boundary
+#
+# Columns are memoryviews over the mapping (numpy.frombuffer(column) wraps one
+# without copying), and slicing them does not copy either. They stay readable after
+# the FlightColumns is closed: the mapping is only unmapped once no column of it is
+# referenced any more, so holding on to a column holds on to the whole mapping.
+
+MAGIC = b'FLTC'
+VERSION = 1
+_prefix = struct.Struct('<4sHHQ')
+_alignment = 8
+
+
+def _aligned(offset):
+    return (offset + _alignment - 1) // _alignment * _alignment
+
+
+def _sample(value):
+    # Gaps in the series are recorded as NaN
+    return float(value) if value is not None else math.nan
+
+
+def write_columns(output, series):
+    """
+    Write series, a dict of name to a sequence of numbers (None for gaps), to
+    output, a binary file object, in the columnar format.
+    """
+    arrays = [(name, array('d', (_sample(value) for value in values))) for name, values in series.items()]
+
+    # The offsets depend on the index length, which depends on the offsets' digits,
+    # so the index is laid out until its length settles.
+    index_length = 0
+    while True:
+        offset = _aligned(_prefix.size + index_length)
+        entries = []
+        for name, values in arrays:
+            entries.append({'name': name, 'offset': offset, 'length': len(values)})
+            offset = _aligned(offset + len(values) * values.itemsize)
+        index = json.dumps({'byteorder': sys.byteorder, 'series': entries}).encode('utf-8')
+        if len(index) == index_length:
+            break
+        index_length = len(index)
+
+    output.write(_prefix.pack(MAGIC, VERSION, 0, len(index)))
+    output.write(index)
+    position = _prefix.size + len(index)
+    for entry, (_, values) in zip(entries, arrays):
+        output.write(b'\0' * (entry['offset'] - position))
+        values.tofile(output)
+        position = entry['offset'] + len(values) * values.itemsize
+
+
+def columns_from_flight_data(data):
+    """The numeric series of a Flight.data() payload, as write_columns takes them."""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    series = {}
+    for name, values in json.loads(data)['series_data'].items():
+        if isinstance(values, list) and all(value is None or isinstance(value, (int, float)) for value in values):
+            series[name] = values
+    return series
+
+
+class FlightColumns():
+    """Read only access to a file in the columnar format, mapped in memory."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, index_length = _prefix.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('%s is not a flight columns file' % path)
+
+        index = json.loads(self._map[_prefix.size:_prefix.size + index_length].decode('utf-8'))
+        if index['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError('%s was written with %s endian samples' % (path, index['byteorder']))
+
+        self._series = {entry['name']: entry for entry in index['series']}
+        self._view = memoryview(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        try:
+            self._map.close()
+        except BufferError:
+            # Columns still referenced keep the mapping, which is unmapped with the last of them
+            pass
+
+    @property
+    def names(self):
+        return list(self._series)
+
+    def __contains__(self, name):
+        return name in self._series
+
+    def column(self, name):
+        """The samples of series name, as a memoryview of floats over the file."""
+        entry = self._series[name]
+        start = entry['offset']
+        return self._view[start:start + entry['length'] * 8].cast('d')
+
+    def window(self, names, time_name, start, end):
+        """
+        {name: samples} of the series names between the times start and end
+        (inclusive), with time_name the series of sample times, in ascending order.
+        """
+        times = self.column(time_name)
+        first = bisect_left(times, start)
+        last = bisect_right(times, end)
+        return {name: self.column(name)[first:last] for name in names}
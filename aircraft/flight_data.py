@@ -0,0 +1,127 @@
+# Core
+import json
+import re
+
+# Reads the structure of Flight.data() payloads, {"series_data": {name: samples, ...}, ...},
+# without decoding the samples: values that are not needed are skipped by scanning for
+# the end of their brackets, which keeps a 10-hour flight from being turned into
+# millions of Python floats just to list its series.
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_string = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_scalar = re.compile(r'[^,\]}\s]*')
+# What changes the nesting of an array or object, or separates its items
+_token = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{},]', re.DOTALL)
+# What a flat array of numbers does not contain
+_nesting = re.compile(r'[\[{"]')
+# An array of flat arrays of numbers, such as [[time, value], ...]
+_rows = re.compile(r'\[\s*(?:\[[^\[\]{}"]*\]\s*,\s*)*\[[^\[\]{}"]*\]\s*\]')
+
+
+def _skip_whitespace(text, index):
+    return _whitespace.match(text, index).end()
+
+
+def _scan_value(text, index):
+    """
+    (end, length) of the JSON value starting at index: the index just past it and,
+    for an array, its number of items (None for other values).
+    """
+    char = text[index]
+
+    if char == '"':
+        return _string.match(text, index).end(), None
+
+    if char not in '[{':
+        return _scalar.match(text, index).end(), None
+
+    if char == '[':
+        # Flat arrays of numbers, the bulk of a flight, are measured without a Python loop
+        end = text.find(']', index)
+        if end != -1 and _nesting.search(text, index + 1, end) is None:
+            if text[_skip_whitespace(text, index + 1)] == ']':
+                return end + 1, 0
+            return end + 1, text.count(',', index, end) + 1
+
+        rows = _rows.match(text, index)
+        if rows is not None:
+            return rows.end(), text.count('[', index + 1, rows.end())
+
+    depth = 0
+    items = 0
+    empty = True
+    for match in _token.finditer(text, index):
+        token = match.group()
+        if token in ('[', '{'):
+            if depth == 1:
+                empty = False
+            depth += 1
+        elif token in (']', '}'):
+            depth -= 1
+            if depth == 0:
+                length = None
+                if char == '[':
+                    length = 0 if empty else items + 1
+                return match.end(), length
+        elif depth == 1:
+            if token == ',':
+                items += 1
+            else:
+                empty = False
+    raise ValueError('Unterminated JSON value at %d' % index)
+
+
+def _members(text, index, scan=False):
+    """
+    (key, value index, scanned) of each member of the JSON object at index.
+    scanned is _scan_value() of the value when scan is set, otherwise the value is
+    only scanned past once the consumer asks for the next member.
+    """
+    if text[index] != '{':
+        raise ValueError('Expected a JSON object at %d' % index)
+
+    index = _skip_whitespace(text, index + 1)
+    if text[index] == '}':
+        return
+
+    while True:
+        key_end = _string.match(text, index).end()
+        key = json.loads(text[index:key_end])
+        index = _skip_whitespace(text, key_end)
+        if text[index] != ':':
+            raise ValueError('Expected ":" at %d' % index)
+        value_index = _skip_whitespace(text, index + 1)
+
+        if scan:
+            scanned = _scan_value(text, value_index)
+            yield key, value_index, scanned
+        else:
+            yield key, value_index, None
+            scanned = _scan_value(text, value_index)
+
+        index = _skip_whitespace(text, scanned[0])
+        if text[index] == '}':
+            return
+        if text[index] != ',':
+            raise ValueError('Expected "," or "}" at %d' % index)
+        index = _skip_whitespace(text, index + 1)
+
+
+def series_metadata(data):
+    """
+    Yield (name, samples) for each series of a Flight.data() payload, in payload
+    order; samples is the length of the series when it is an array, else None.
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    for key, value_index, _ in _members(data, _skip_whitespace(data, 0)):
+        if key == 'series_data':
+            for name, _, (_, samples) in _members(data, value_index, scan=True):
+                yield name, samples
+            return
+
+
+def series_names(data):
+    """The series_data keys of a Flight.data() payload."""
+    return [name for name, _ in series_metadata(data)]
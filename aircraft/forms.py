@@ -9,6 +9,7 @@ from django.forms.models import model_to_dict
 from django.forms import ModelForm
 
 # App
+from aircraft.fleet import user_fleet
 from aircraft.models import (
     Aircraft,
     AircraftConversion,
@@ -26,8 +27,7 @@ from dal import autocomplete, forward
 REGISTRATIONNO_REGEX = r'^([A-Z0-9]{2,}|[A-Z0-9]+-[A-Z0-9]+)$'
 
 def aircraft_for_user(user_id):
-    planes = Aircraft.objects.filter(user_id = user_id, hidden=False)
-    return [(p.id, p.registration_no) for p in planes]
+    return [(a.id, a.registration_no) for a in user_fleet(user_id) if not a.hidden]
 
 class AircraftSelectForm(forms.Form):
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,34 @@
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# App
+from aircraft.utils import build_flight_columns, flight_columns_dir
+from flights.models import Flight
+
+
+class Command(BaseCommand):
+    help = 'Write the series of flights in the columnar, memory mappable format.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', nargs='+', type=int, help='Aircraft ids (default: all aircraft)')
+        parser.add_argument('--flights', nargs='+', type=int, help='Flight ids')
+
+    def handle(self, *args, **options):
+        if flight_columns_dir() is None:
+            raise CommandError('Set FLIGHT_COLUMNS_DIR to a local directory shared by every host serving flights.')
+
+        flights = Flight.objects.order_by('id')
+        if options['aircraft']:
+            flights = flights.filter(aircraft_id__in=options['aircraft'])
+        if options['flights']:
+            flights = flights.filter(id__in=options['flights'])
+
+        count = 0
+        for flight in flights.iterator():
+            try:
+                build_flight_columns(flight)
+            except Exception as e:
+                self.stderr.write('Flight {}: {}'.format(flight.id, e))
+                continue
+            count += 1
+        self.stdout.write('Wrote the columns of {} flights'.format(count))
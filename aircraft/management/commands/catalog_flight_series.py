@@ -0,0 +1,28 @@
+# Django
+from django.core.management.base import BaseCommand
+
+# App
+from aircraft.utils import catalog_flight_series
+from flights.models import Flight
+
+
+class Command(BaseCommand):
+    help = 'Record the series of already ingested flights in the per-aircraft series catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', nargs='+', type=int, help='Aircraft ids (default: all aircraft)')
+
+    def handle(self, *args, **options):
+        flights = Flight.objects.order_by('id')
+        if options['aircraft']:
+            flights = flights.filter(aircraft_id__in=options['aircraft'])
+
+        count = 0
+        for flight in flights.iterator():
+            try:
+                catalog_flight_series(flight)
+            except Exception as e:
+                self.stderr.write('Flight {}: {}'.format(flight.id, e))
+                continue
+            count += 1
+        self.stdout.write('Cataloged the series of {} flights'.format(count))
@@ -0,0 +1,16 @@
+# Django
+from django.core.management.base import BaseCommand
+
+# App
+from aircraft.utils import reconcile_flight_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized flight count and last flight of aircraft from their flights.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', nargs='+', type=int, help='Aircraft ids (default: all aircraft)')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_flight_stats(options['aircraft'])
+        self.stdout.write('Corrected the flight stats of {} aircraft'.format(fixed))
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.7 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_flight_stats(apps, schema_editor):
+    Aircraft = apps.get_model('aircraft', 'Aircraft')
+    AircraftFlightStats = apps.get_model('aircraft', 'AircraftFlightStats')
+
+    stats = Aircraft.objects.annotate(count=models.Count('flight'), last=models.Max('flight__id')) \
+        .values_list('id', 'count', 'last')
+    AircraftFlightStats.objects.bulk_create(
+        (AircraftFlightStats(aircraft_id=aircraft_id, flight_count=count, last_flight_id=last)
+         for aircraft_id, count, last in stats.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aircraft', '0001_initial'),
+        ('flights', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AircraftFlightStats',
+            fields=[
+                ('aircraft', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='flight_stats', serialize=False, to='aircraft.aircraft')),
+                ('flight_count', models.PositiveIntegerField(default=0)),
+                ('last_flight_id', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_flight_stats, migrations.RunPython.noop),
+    ]
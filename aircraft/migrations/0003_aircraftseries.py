@@ -0,0 +1,27 @@
+# Generated by Django 3.1.7 on 2026-10-18 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aircraft', '0002_aircraftflightstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AircraftSeries',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('first_flight_id', models.IntegerField()),
+                ('last_flight_id', models.IntegerField(db_index=True)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='aircraft.aircraft')),
+            ],
+            options={
+                'unique_together': {('aircraft', 'name')},
+            },
+        ),
+    ]
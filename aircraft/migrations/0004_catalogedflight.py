@@ -0,0 +1,22 @@
+# Generated by Django 3.1.7 on 2026-10-18 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aircraft', '0003_aircraftseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogedFlight',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_id', models.IntegerField(unique=True)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cataloged_flights', to='aircraft.aircraft')),
+            ],
+        ),
+    ]
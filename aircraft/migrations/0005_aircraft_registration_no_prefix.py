@@ -0,0 +1,22 @@
+# Generated by Django 3.1.7 on 2026-10-18 23:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so the table stays writable. Databases that created it
+    # through analyst 0006_aircraft_search_indexes keep theirs.
+    atomic = False
+
+    dependencies = [
+        ('aircraft', '0004_catalogedflight'),
+    ]
+
+    operations = [
+        # Serves the registration_no__istartswith lookups of the analyst aircraft search
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS aircraft_aircraft_registration_no_prefix '
+            'ON aircraft_aircraft (UPPER(registration_no) text_pattern_ops)',
+            'DROP INDEX CONCURRENTLY IF EXISTS aircraft_aircraft_registration_no_prefix',
+        ),
+    ]
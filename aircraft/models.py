@@ -70,4 +70,39 @@ class EngineMonitorModel(models.Model):
     ignore = models.BooleanField(default = False)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class AircraftFlightStats(models.Model):
+    # Denormalized from the aircraft's flights, kept up to date by aircraft.signals
+    # and rebuilt by the reconcile_flight_stats command
+    aircraft = models.OneToOneField('Aircraft', primary_key=True, related_name='flight_stats', on_delete=models.CASCADE)
+    flight_count = models.PositiveIntegerField(default=0)
+    last_flight_id = models.IntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return "%s: %d flights" % (self.aircraft_id, self.flight_count)
+
+
+class AircraftSeries(models.Model):
+    # A data series recorded by the aircraft's engine monitor, with the first and
+    # last flight it was seen in, see aircraft.utils.catalog_flight_series
+    aircraft = models.ForeignKey('Aircraft', related_name='series', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    first_flight_id = models.IntegerField()
+    last_flight_id = models.IntegerField(db_index=True)
+
+    class Meta:
+        unique_together = ('aircraft', 'name')
+
+    def __str__(self):
+        return self.name
+
+
+class CatalogedFlight(models.Model):
+    # A flight whose series are in its aircraft's AircraftSeries catalog
+    aircraft = models.ForeignKey('Aircraft', related_name='cataloged_flights', on_delete=models.CASCADE)
+    flight_id = models.IntegerField(unique=True)
+
+    def __str__(self):
+        return "%s: flight %d" % (self.aircraft_id, self.flight_id)
@@ -0,0 +1,100 @@
+# Core
+import logging
+
+# Django
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+# Third-Party
+
+# App
+from account.models import AnalysisPack, Subscription
+from aircraft.conversions import invalidate_conversion_plan
+from aircraft.entitlements import invalidate_entitlements
+from aircraft.fleet import invalidate_user_fleet
+from aircraft.models import Aircraft, AircraftConversion, UnitConversion
+from aircraft.utils import (build_flight_columns, catalog_flight_series, forget_flight_series, record_flight_added,
+                            record_flight_deleted, remove_flight_columns)
+from flights.models import Flight
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.aircraft_id is not None:
+        record_flight_added(instance)
+        transaction.on_commit(lambda: index_new_flight(instance))
+
+
+@receiver(post_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    if instance.aircraft_id is not None:
+        record_flight_deleted(instance)
+        forget_flight_series(instance)
+    flight_id = instance.id
+    transaction.on_commit(lambda: remove_flight_columns(flight_id))
+
+
+def index_new_flight(flight):
+    # The catalog and the columns are both made from the whole flight data, read once
+    # for them. A flight left out is cataloged by recent_series_names when it is read,
+    # and flight_series reads it from its data.
+    try:
+        data = flight.data()
+        catalog_flight_series(flight, data)
+    except Exception:
+        logger.exception('Could not catalog the series of flight %s', flight.id)
+        return
+    try:
+        build_flight_columns(flight, data)
+    except Exception:
+        logger.exception('Could not write the columns of flight %s', flight.id)
+
+
+@receiver(post_save, sender=AircraftConversion)
+@receiver(post_delete, sender=AircraftConversion)
+def conversion_changed(sender, instance, **kwargs):
+    # aircraft_add_conversion and aircraft_remove_conversion save/delete these
+    invalidate_conversion_plan(instance.aircraft_id)
+
+
+@receiver(post_save, sender=UnitConversion)
+def unit_conversion_changed(sender, instance, created, **kwargs):
+    # Edited in the admin, the plans of every aircraft using it hold its parameters.
+    # A UnitConversion in use cannot be deleted (AircraftConversion protects it).
+    if created:
+        return
+    for aircraft_id in set(instance.aircraftconversion_set.values_list('aircraft_id', flat=True)):
+        invalidate_conversion_plan(aircraft_id)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=AnalysisPack)
+@receiver(post_delete, sender=AnalysisPack)
+def entitlement_changed(sender, instance, **kwargs):
+    # Entitlements already loaded may no longer hold
+    invalidate_entitlements()
+
+
+def invalidate_user_fleet_on_commit(user_id):
+    # Bumped before the commit, a reader could still cache the old rows under the new version
+    transaction.on_commit(lambda: invalidate_user_fleet(user_id))
+
+
+@receiver(post_init, sender=Aircraft)
+def aircraft_loaded(sender, instance, **kwargs):
+    # The owner the aircraft was loaded with, to tell the fleet it leaves on a save
+    instance._loaded_user_id = instance.user_id
+
+
+@receiver(post_save, sender=Aircraft)
+@receiver(post_delete, sender=Aircraft)
+def aircraft_changed(sender, instance, **kwargs):
+    invalidate_user_fleet_on_commit(instance.user_id)
+    loaded_user_id = getattr(instance, '_loaded_user_id', None)
+    if loaded_user_id is not None and loaded_user_id != instance.user_id:
+        invalidate_user_fleet_on_commit(loaded_user_id)
+    instance._loaded_user_id = instance.user_id
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase
+from model_mommy import mommy
+
+from aircraft.conversions import conversion_plan
+from aircraft.models import Aircraft, AircraftConversion, UnitConversion
+
+
+class TestConversionPlan(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.aircraft = mommy.make(Aircraft)
+        self.to_fahrenheit = mommy.make(UnitConversion, from_name='Celsius', to_name='Fahrenheit', a_param=1.8, b_param=32)
+        self.pph_to_gph = mommy.make(UnitConversion, from_name='PPH', to_name='GPH', a_param=1 / 6.0, b_param=0)
+
+    def test_apply(self):
+        mommy.make(AircraftConversion, aircraft=self.aircraft, series_name='FF', unitconversion=self.pph_to_gph)
+        plan = conversion_plan(self.aircraft.id)
+        self.assertEqual(plan.apply('FF', [60, 12]).tolist(), [10, 2])
+        self.assertEqual(plan.apply('RPM', [2400]).tolist(), [2400])
+
+    def test_apply_group(self):
+        mommy.make(AircraftConversion, aircraft=self.aircraft, series_name='CHT (all cylinders)',
+                   unitconversion=self.to_fahrenheit)
+        plan = conversion_plan(self.aircraft.id)
+        converted = plan.apply_all({'CHT1': [100, 200], 'E1 CHT6': [0], 'OILT': [100]})
+        self.assertEqual(converted['CHT1'].tolist(), [212, 392])
+        self.assertEqual(converted['E1 CHT6'].tolist(), [32])
+        self.assertEqual(converted['OILT'].tolist(), [100])
+
+    def test_plan_is_cached_until_conversions_change(self):
+        self.assertFalse(conversion_plan(self.aircraft.id))
+        with self.assertNumQueries(0):
+            self.assertFalse(conversion_plan(self.aircraft.id))
+
+        conversion = mommy.make(AircraftConversion, aircraft=self.aircraft, series_name='FF',
+                                unitconversion=self.pph_to_gph)
+        self.assertIsNotNone(conversion_plan(self.aircraft.id).step_for('FF'))
+
+        conversion.delete()
+        self.assertIsNone(conversion_plan(self.aircraft.id).step_for('FF'))
+
+    def test_plan_is_invalidated_when_unit_conversion_changes(self):
+        mommy.make(AircraftConversion, aircraft=self.aircraft, series_name='FF', unitconversion=self.pph_to_gph)
+        self.assertEqual(conversion_plan(self.aircraft.id).apply('FF', [60]).tolist(), [10])
+
+        self.pph_to_gph.a_param = 1 / 6.7
+        self.pph_to_gph.save()
+        self.assertAlmostEqual(conversion_plan(self.aircraft.id).apply('FF', [67])[0], 10)
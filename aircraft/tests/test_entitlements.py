@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from model_mommy import mommy
+
+from account.models import AnalysisPack, Subscription, SubscriptionType, User
+from aircraft.entitlements import Entitlements, PackSummary, pack_summary
+from aircraft.models import Aircraft
+
+
+class TestEntitlements(TestCase):
+    def setUp(self):
+        self.user = mommy.make(User, email='test@example.com')
+        self.aircraft = mommy.make(Aircraft, user=self.user)
+        self.other_aircraft = mommy.make(Aircraft, user=self.user)
+        mommy.make(SubscriptionType, name="normal")
+        self.current = mommy.make(Subscription, aircraft=self.aircraft, start_date=timezone.now() - timedelta(days=60),
+                                  end_date=timezone.now() + timedelta(days=59))
+        mommy.make(Subscription, aircraft=self.aircraft, start_date=timezone.now() - timedelta(days=600),
+                   end_date=timezone.now() + timedelta(days=500))
+
+    def test_current_subscription(self):
+        entitlements = Entitlements()
+        with self.assertNumQueries(1):
+            entitlements.load(aircraft_ids=[self.aircraft.id, self.other_aircraft.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(entitlements.current_subscription(self.aircraft), self.current)
+            self.assertEqual(entitlements.current_subscription(self.aircraft), self.aircraft.current_subscription())
+            self.assertIsNone(entitlements.current_subscription(self.other_aircraft))
+
+    def test_oldest_valid_pack(self):
+        mommy.make(AnalysisPack, user=self.user, expiration_date=timezone.now() - timedelta(days=1), remaining_incidents=5)
+        pack = mommy.make(AnalysisPack, user=self.user, expiration_date=timezone.now() + timedelta(days=100),
+                          remaining_incidents=5)
+        entitlements = Entitlements()
+        self.assertEqual(entitlements.oldest_valid_pack(self.user), pack)
+        with self.assertNumQueries(0):
+            self.assertEqual(entitlements.oldest_valid_pack(self.user), pack)
+
+    def test_invalidated_on_subscription_writes(self):
+        entitlements = Entitlements()
+        self.assertIsNone(entitlements.current_subscription(self.other_aircraft))
+        subscription = mommy.make(Subscription, aircraft=self.other_aircraft,
+                                  start_date=timezone.now() - timedelta(days=1), end_date=timezone.now() + timedelta(days=364))
+        self.assertEqual(entitlements.current_subscription(self.other_aircraft), subscription)
+
+        subscription.delete()
+        self.assertIsNone(entitlements.current_subscription(self.other_aircraft))
+
+    def test_pack_summary(self):
+        self.assertEqual(pack_summary(self.user.id), PackSummary(0, 0, None))
+        mommy.make(AnalysisPack, user=self.user, expiration_date=timezone.now() - timedelta(days=1), remaining_incidents=2)
+        mommy.make(AnalysisPack, user=self.user, expiration_date=timezone.now() + timedelta(days=100), remaining_incidents=5)
+        mommy.make(AnalysisPack, user=self.user, expiration_date=timezone.now() + timedelta(days=10), remaining_incidents=3)
+        with self.assertNumQueries(1):
+            self.assertEqual(pack_summary(self.user.id), PackSummary(3, 2, 8))
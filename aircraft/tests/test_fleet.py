@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from model_mommy import mommy
+
+from account.models import User
+from aircraft.fleet import FleetAircraft, user_fleet
+from aircraft.forms import aircraft_for_user
+from aircraft.models import Aircraft
+
+
+class TestUserFleet(TransactionTestCase):
+    # Fleets are invalidated once writes commit
+
+    def setUp(self):
+        cache.clear()
+        self.user = mommy.make(User, email='test@example.com')
+        self.aircraft = mommy.make(Aircraft, user=self.user, registration_no='N2', hidden=False)
+        self.hidden = mommy.make(Aircraft, user=self.user, registration_no='N1', hidden=True)
+
+    def test_user_fleet(self):
+        self.assertEqual(user_fleet(self.user.id), [FleetAircraft(self.hidden.id, 'N1', True),
+                                                    FleetAircraft(self.aircraft.id, 'N2', False)])
+        with self.assertNumQueries(0):
+            user_fleet(self.user.id)
+            self.assertEqual(aircraft_for_user(self.user.id), [(self.aircraft.id, 'N2')])
+
+    def test_invalidated_on_aircraft_writes(self):
+        user_fleet(self.user.id)
+        self.aircraft.registration_no = 'N3'
+        self.aircraft.save()
+        self.assertEqual(aircraft_for_user(self.user.id), [(self.aircraft.id, 'N3')])
+
+        other_user = mommy.make(User, email='other@example.com')
+        self.assertEqual(aircraft_for_user(other_user.id), [])
+        self.aircraft.user = other_user
+        self.aircraft.save()
+        self.assertEqual(aircraft_for_user(self.user.id), [])
+        self.assertEqual(aircraft_for_user(other_user.id), [(self.aircraft.id, 'N3')])
+
+        self.aircraft.delete()
+        self.assertEqual(aircraft_for_user(other_user.id), [])
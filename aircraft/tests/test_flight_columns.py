@@ -0,0 +1,64 @@
+import io
+import json
+import math
+import os
+import tempfile
+
+from django.test import TestCase
+
+from aircraft.flight_columns import FlightColumns, columns_from_flight_data, write_columns
+
+
+class TestFlightColumns(TestCase):
+    def setUp(self):
+        self.series = {
+            'TIME': [0, 1, 2, 3, 4, 5],
+            'EGT1': [1300.5, 1310, 1320, None, 1340, 1350],
+            'Empty': [],
+        }
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as output:
+            write_columns(output, self.series)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_column(self):
+        with FlightColumns(self.path) as columns:
+            self.assertEqual(columns.names, ['TIME', 'EGT1', 'Empty'])
+            self.assertIn('EGT1', columns)
+            egt = columns.column('EGT1')
+            self.assertEqual(egt[:3].tolist(), [1300.5, 1310, 1320])
+            self.assertTrue(math.isnan(egt[3]))
+            self.assertEqual(len(columns.column('Empty')), 0)
+
+    def test_window(self):
+        with FlightColumns(self.path) as columns:
+            window = columns.window(['EGT1'], 'TIME', 0.5, 2)
+            self.assertEqual(window['EGT1'].tolist(), [1310, 1320])
+
+    def test_columns_outlive_close(self):
+        with FlightColumns(self.path) as columns:
+            egt = columns.column('EGT1')
+        self.assertEqual(egt[:2].tolist(), [1300.5, 1310])
+
+    def test_close_keeps_the_original_exception(self):
+        with self.assertRaises(KeyError):
+            with FlightColumns(self.path) as columns:
+                egt = columns.column('EGT1')
+                columns.column('Missing')
+
+    def test_not_a_columns_file(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'{"series_data": {}}' + b' ' * 16)
+        with self.assertRaises(ValueError):
+            FlightColumns(self.path)
+
+    def test_columns_from_flight_data(self):
+        data = json.dumps({'series_data': {'EGT1': [1, None, 2.5], 'Note': 'text', 'Mixed': [1, 'a']}})
+        self.assertEqual(columns_from_flight_data(data), {'EGT1': [1, None, 2.5]})
+
+    def test_write_columns_aligns_series(self):
+        output = io.BytesIO()
+        write_columns(output, {'A': [1.0], 'B': [2.0]})
+        self.assertEqual(len(output.getvalue()) % 8, 0)
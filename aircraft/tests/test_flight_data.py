@@ -0,0 +1,42 @@
+import json
+import random
+
+from django.test import TestCase
+
+from aircraft.flight_data import series_metadata, series_names
+
+
+def random_value(depth=0):
+    r = random.random()
+    if depth > 3 or r < 0.3:
+        return random.choice([1, -2.5e3, 's]"{,', None, True, 'x'])
+    if r < 0.65:
+        return [random_value(depth + 1) for _ in range(random.randint(0, 4))]
+    return {'k{}"]'.format(k): random_value(depth + 1) for k in range(random.randint(0, 3))}
+
+
+class TestFlightData(TestCase):
+    def test_series_names(self):
+        data = json.dumps({'series_data': {'EGT': 'EGT', 'D': 'Test'}})
+        self.assertEqual(series_names(data), ['EGT', 'D'])
+        self.assertEqual(series_names(data.encode('utf-8')), ['EGT', 'D'])
+
+    def test_series_metadata(self):
+        data = '{ "x": {"series_data": 1}, "series_data": { "A\\"b": [ ], "B": [1, 2,3], "C": [[1, 2], [3, 4]], ' \
+               '"D": [{"t": "]"}, {"t": 2}], "E": null }, "time": [1, 2] }'
+        self.assertEqual(list(series_metadata(data)),
+                         [('A"b', 0), ('B', 3), ('C', 2), ('D', 2), ('E', None)])
+
+    def test_series_metadata_matches_json(self):
+        random.seed(7)
+        for _ in range(500):
+            payload = {'pre': random_value(),
+                       'series_data': {str(k): random_value() for k in range(random.randint(0, 5))},
+                       'post': random_value()}
+            expected = [(name, len(value) if isinstance(value, list) else None)
+                        for name, value in payload['series_data'].items()]
+            self.assertEqual(list(series_metadata(json.dumps(payload, indent=random.choice([None, 1])))), expected)
+
+    def test_series_metadata_invalid(self):
+        with self.assertRaises(ValueError):
+            list(series_metadata('[1, 2]'))
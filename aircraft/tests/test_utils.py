@@ -1,13 +1,23 @@
+import json
+import math
+import os
+import shutil
+import tempfile
 from datetime import timedelta
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 
 from model_mommy import mommy
+from mock import patch
 
-from account.models import User
-from aircraft.utils import my_aircraft_string, paid_aircraft_for_user
-from aircraft.models import Aircraft
+from account.models import Subscription, SubscriptionType, User
+from aircraft.entitlements import Entitlements
+from aircraft.utils import (build_flight_columns, flight_columns_path, flight_series, my_aircraft_string,
+                            paid_aircraft_for_user, reconcile_flight_stats, record_flight_series, recent_series_names)
+from aircraft.models import Aircraft, AircraftConversion, AircraftFlightStats, AircraftSeries, UnitConversion
+from flights.models import Flight
 
 class TestUtils(TestCase):
     def setUp(self):
@@ -31,3 +41,135 @@ class TestUtils(TestCase):
         mommy.make('account.AnalysisPack', user=self.user, expiration_date=timezone.now() + timedelta(days=100), remaining_incidents=5)
         list = paid_aircraft_for_user(user_id=self.user.id)
         self.assertEqual(len(list), 1)
+
+    def test_paid_aircraft_for_user_used_up_pack(self):
+        mommy.make('account.AnalysisPack', user=self.user, expiration_date=timezone.now() + timedelta(days=100), remaining_incidents=0)
+        self.assertEqual(paid_aircraft_for_user(user_id=self.user.id), [])
+        self.assertIsNone(Entitlements().oldest_valid_pack(self.user))
+
+    def test_paid_aircraft_for_user_subscription(self):
+        mommy.make(SubscriptionType, name="normal")
+        mommy.make(Subscription, aircraft=self.aircraft, start_date=timezone.now() - timedelta(days=60),
+                   end_date=timezone.now() + timedelta(days=59))
+        lapsed = mommy.make(Aircraft, user=self.user)
+        mommy.make(Subscription, aircraft=lapsed, start_date=timezone.now() - timedelta(days=400),
+                   end_date=timezone.now() - timedelta(days=35))
+        mommy.make(Aircraft, user=self.user, _quantity=3)
+        with self.assertNumQueries(1):
+            list = paid_aircraft_for_user(user_id=self.user.id)
+        self.assertEqual(list, [(self.aircraft.id, self.aircraft.registration_no)])
+
+
+class TestFlightStats(TestCase):
+    def setUp(self):
+        self.aircraft = mommy.make(Aircraft)
+
+    def stats(self):
+        return AircraftFlightStats.objects.get(aircraft=self.aircraft)
+
+    def test_flight_stats_follow_flights(self):
+        first = mommy.make(Flight, aircraft=self.aircraft)
+        last = mommy.make(Flight, aircraft=self.aircraft)
+        self.assertEqual((self.stats().flight_count, self.stats().last_flight_id), (2, last.id))
+
+        last.delete()
+        self.assertEqual((self.stats().flight_count, self.stats().last_flight_id), (1, first.id))
+
+        first.delete()
+        self.assertEqual((self.stats().flight_count, self.stats().last_flight_id), (0, None))
+
+    def test_reconcile_flight_stats(self):
+        flight = mommy.make(Flight, aircraft=self.aircraft)
+        AircraftFlightStats.objects.filter(aircraft=self.aircraft).update(flight_count=5, last_flight_id=None)
+        self.assertEqual(reconcile_flight_stats([self.aircraft.id]), 1)
+        self.assertEqual((self.stats().flight_count, self.stats().last_flight_id), (1, flight.id))
+        self.assertEqual(reconcile_flight_stats([self.aircraft.id]), 0)
+
+
+class TestSeriesCatalog(TestCase):
+    def setUp(self):
+        self.aircraft = mommy.make(Aircraft)
+        self.flights = [mommy.make(Flight, aircraft=self.aircraft) for _ in range(6)]
+
+    def test_record_flight_series(self):
+        record_flight_series(self.flights[3], ['EGT1', 'FF'])
+        record_flight_series(self.flights[1], ['FF'])
+        record_flight_series(self.flights[5], ['FF', 'OILT'])
+
+        catalog = {s.name: (s.first_flight_id, s.last_flight_id) for s in AircraftSeries.objects.all()}
+        self.assertEqual(catalog, {'EGT1': (self.flights[3].id, self.flights[3].id),
+                                   'FF': (self.flights[1].id, self.flights[5].id),
+                                   'OILT': (self.flights[5].id, self.flights[5].id)})
+
+    def test_recent_series_names(self):
+        for flight in self.flights[2:5]:
+            record_flight_series(flight, [])
+        record_flight_series(self.flights[0], ['MAP'])
+        record_flight_series(self.flights[1], ['RPM'])
+        record_flight_series(self.flights[5], ['FF'])
+        self.assertEqual(sorted(recent_series_names(self.aircraft)), ['FF', 'RPM'])
+
+    @patch('flights.models.Flight.data')
+    def test_recent_series_names_catalogs_missing_flights(self, mock_data):
+        mock_data.return_value = json.dumps({'series_data': {'OILT': [1, 2]}})
+        for flight in self.flights[:5]:
+            record_flight_series(flight, ['FF'])
+        self.assertEqual(sorted(recent_series_names(self.aircraft)), ['FF', 'OILT'])
+        self.assertEqual(mock_data.call_count, 1)
+
+    @patch('flights.models.Flight.data')
+    def test_recent_series_names_after_delete(self, mock_data):
+        mock_data.return_value = json.dumps({'series_data': {'FF': [1, 2]}})
+        for flight in self.flights:
+            record_flight_series(flight, ['FF'])
+        record_flight_series(self.flights[5], ['OILT'])
+        self.flights[5].delete()
+        self.assertEqual(recent_series_names(self.aircraft), ['FF'])
+        self.assertEqual(AircraftSeries.objects.get(name='FF').last_flight_id, self.flights[4].id)
+
+
+class TestFlightSeries(TransactionTestCase):
+    # Columns are written once the flight commits
+
+    def setUp(self):
+        cache.clear()
+        self.columns_dir = tempfile.mkdtemp()
+        self.data = json.dumps({'series_data': {'EGT1': [1300, None], 'FF': [9.5, 9.6], 'NOTE': ['a', 'b']}})
+
+    def tearDown(self):
+        shutil.rmtree(self.columns_dir)
+
+    @patch('flights.models.Flight.data')
+    def test_flight_series_from_columns(self, mock_data):
+        mock_data.return_value = self.data
+        with override_settings(FLIGHT_COLUMNS_DIR=self.columns_dir):
+            flight = mommy.make(Flight, aircraft=mommy.make(Aircraft))
+            self.assertTrue(os.path.exists(flight_columns_path(flight.id)))
+            self.assertEqual(mock_data.call_count, 1)
+
+            series = flight_series(flight, ['FF', 'OILT'])
+            self.assertEqual({name: samples.tolist() for name, samples in series.items()}, {'FF': [9.5, 9.6]})
+            self.assertEqual(mock_data.call_count, 1)
+
+            flight_id = flight.id
+            flight.delete()
+            self.assertFalse(os.path.exists(flight_columns_path(flight_id)))
+
+    @patch('flights.models.Flight.data')
+    def test_flight_series_from_data(self, mock_data):
+        mock_data.return_value = self.data
+        flight = mommy.make(Flight, aircraft=mommy.make(Aircraft))
+        self.assertIsNone(build_flight_columns(flight))
+        series = flight_series(flight, ['EGT1', 'NOTE'])
+        self.assertEqual(list(series), ['EGT1'])
+        self.assertEqual(series['EGT1'][0], 1300)
+        self.assertTrue(math.isnan(series['EGT1'][1]))
+
+    @patch('flights.models.Flight.data')
+    def test_flight_series_converted(self, mock_data):
+        mock_data.return_value = self.data
+        flight = mommy.make(Flight, aircraft=mommy.make(Aircraft))
+        pph_to_gph = mommy.make(UnitConversion, from_name='PPH', to_name='GPH', a_param=0.5, b_param=0)
+        mommy.make(AircraftConversion, aircraft=flight.aircraft, series_name='FF', unitconversion=pph_to_gph)
+        self.assertEqual(flight_series(flight, ['FF'])['FF'].tolist(), [4.75, 4.8])
+
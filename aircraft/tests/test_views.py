@@ -2,6 +2,7 @@ import json
 import uuid
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.test import TestCase, RequestFactory
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -691,7 +692,7 @@ class TestAircraftDeleteView(TestCase):
         self.assertEqual(result.context['text'], 'Aircraft does not exist.')
 
     def test_aircraft_add_conversion_view_aircraft_active_subscriptions(self):
-        with patch('aircraft.models.Aircraft.current_subscription') as mock_sub:
+        with patch('aircraft.entitlements.Entitlements.current_subscription') as mock_sub:
             mock_sub.return_value = True
             result = self.client.post(self.url)
             self.assertEqual(result.status_code, 200)
@@ -703,6 +704,32 @@ class TestAircraftDeleteView(TestCase):
         self.assertEqual(result.content, b"ok")
 
 
+class TestAircraftFlightSeriesView(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(EMAIL, PASSWORD)
+        self.client.login(username=EMAIL, password=PASSWORD)
+        self.aircraft = mommy.make(Aircraft, user=self.user, hidden=False)
+        self.flight = mommy.make(Flight, aircraft=self.aircraft)
+        self.url = reverse('aircraft_flight_series', args=[self.aircraft.id, self.flight.id])
+
+    def test_aircraft_flight_series_view_not_logged_in(self):
+        self.client.logout()
+        result = self.client.get(self.url)
+        self.assertRedirects(result, LOGIN_URL + NEXT + self.url)
+
+    def test_aircraft_flight_series_view_other_user(self):
+        flight = mommy.make(Flight, aircraft=mommy.make(Aircraft))
+        result = self.client.get(reverse('aircraft_flight_series', args=[flight.aircraft_id, flight.id]))
+        self.assertEqual(result.status_code, 404)
+
+    @patch('flights.models.Flight.data')
+    def test_aircraft_flight_series_view(self, mock_data):
+        mock_data.return_value = json.dumps({'series_data': {'EGT1': [1300, None], 'FF': [9.5, 9.6]}})
+        result = self.client.get(self.url, {'series': ['EGT1', 'OILT']})
+        self.assertEqual(json.loads(result.content), {'EGT1': [1300, None]})
+
+
 class TestCompleteProfileView(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(EMAIL, PASSWORD)
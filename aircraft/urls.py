@@ -35,5 +35,10 @@ urlpatterns = [
         {"kind": "pro"},
         name='complete_profile_pro'),
 
+    # Flight data
+    url(r'^aircraft/(?P<aircraft_id>\d+)/flights/(?P<flight_id>\d+)/series/?$',
+        views.aircraft_flight_series,
+        name='aircraft_flight_series'),
+
 
 ]
@@ -1,41 +1,210 @@
 # Core
+import os
 
 # Django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
 
 # App
-from account.models import User
-from aircraft.models import Aircraft
+from aircraft.conversions import conversion_plan
+from aircraft.entitlements import paid_condition
+from aircraft.flight_columns import FlightColumns, columns_from_flight_data, write_columns
+from aircraft.fleet import user_fleet
+from aircraft.flight_data import series_names
+from aircraft.models import Aircraft, AircraftFlightStats, AircraftSeries, CatalogedFlight
+from flights.models import Flight
 
 # Third-Party
 
 def paid_aircraft_for_user(user_id):
-
+    """
+    (id, registration_no) of the visible aircraft of user_id that are paid for:
+    all of them when the user has a valid analysis pack, otherwise those with a
+    subscription running now. Runs a single query, whatever the fleet size; this
+    gates what may be analysed, so it never reads the cached fleet snapshot.
+    """
     planes = Aircraft.objects.filter(user_id = user_id, hidden=False)
-
-    # If we have pack, then all aircraft are good.
-    if user_id is None:
-        have_pack = False
-    else:
-        user = User.objects.get(id=user_id)
-        if user is not None and user.oldest_valid_pack() is not None:
-            have_pack = True
-        else:
-            have_pack = False
-
-    ret = []
-    for p in planes:
-        if have_pack or p.current_subscription() is not None:
-            ret.append((p.id, p.registration_no))
-    return ret
+    return list(planes.filter(paid_condition(user_id, timezone.now())).values_list('id', 'registration_no'))
 
 
 def my_aircraft_string(user):
-    my_aircraft = Aircraft.objects.filter(user=user).values_list('id')
-    clean_aircraft = []
-    for a in my_aircraft:
-        clean_aircraft.append(a[0])
+    clean_aircraft = [a.id for a in user_fleet(user.id)]
 
     if len(clean_aircraft) < 2:
         clean_aircraft.append(-1)
         clean_aircraft.append(-1)
     return clean_aircraft
+
+
+def reconcile_flight_stats(aircraft_ids=None):
+    """
+    Recount the AircraftFlightStats of aircraft_ids (all aircraft when None) from
+    their flights. Returns the number of aircraft whose counters were off.
+    """
+    aircraft = Aircraft.objects.all()
+    if aircraft_ids is not None:
+        aircraft = aircraft.filter(id__in=aircraft_ids)
+
+    fixed = 0
+    for aircraft_id, flight_count, last_flight_id in aircraft.annotate(count=Count('flight'), last=Max('flight__id')) \
+            .values_list('id', 'count', 'last').iterator():
+        with transaction.atomic():
+            stats, created = AircraftFlightStats.objects.select_for_update().get_or_create(aircraft_id=aircraft_id)
+            if created or stats.flight_count != flight_count or stats.last_flight_id != last_flight_id:
+                stats.flight_count = flight_count
+                stats.last_flight_id = last_flight_id
+                stats.save()
+                fixed += 1
+    return fixed
+
+
+def record_flight_added(flight):
+    with transaction.atomic():
+        updated = AircraftFlightStats.objects.filter(aircraft_id=flight.aircraft_id).update(
+            flight_count=F('flight_count') + 1,
+            last_flight_id=Greatest(Coalesce('last_flight_id', Value(0)), Value(flight.id)))
+        if not updated:
+            reconcile_flight_stats([flight.aircraft_id])
+
+
+def record_flight_deleted(flight):
+    with transaction.atomic():
+        stats = AircraftFlightStats.objects.filter(aircraft_id=flight.aircraft_id)
+        stats.update(flight_count=Greatest(F('flight_count') - 1, Value(0)))
+
+        last_flight = Flight.objects.filter(aircraft_id=OuterRef('aircraft_id')).order_by('-id').values('id')[:1]
+        stats.filter(last_flight_id=flight.id).update(last_flight_id=Subquery(last_flight))
+
+
+def record_flight_series(flight, series_names):
+    """Add series_names, recorded in flight, to the series catalog of its aircraft."""
+    series_names = set(series_names)
+
+    catalog = AircraftSeries.objects.filter(aircraft_id=flight.aircraft_id, name__in=series_names)
+    with transaction.atomic():
+        if series_names:
+            catalog.update(first_flight_id=Least('first_flight_id', Value(flight.id)),
+                           last_flight_id=Greatest('last_flight_id', Value(flight.id)))
+            known = set(catalog.values_list('name', flat=True))
+            AircraftSeries.objects.bulk_create(
+                [AircraftSeries(aircraft_id=flight.aircraft_id, name=name,
+                                first_flight_id=flight.id, last_flight_id=flight.id)
+                 for name in series_names - known],
+                ignore_conflicts=True)
+        CatalogedFlight.objects.get_or_create(flight_id=flight.id, defaults={'aircraft_id': flight.aircraft_id})
+
+
+def catalog_flight_series(flight, data=None):
+    """
+    Record the series of flight in the catalog. Called once a new flight is
+    committed (see aircraft.signals), as it reads the whole flight data (without
+    decoding the samples), unless data, that flight data, is passed.
+    """
+    record_flight_series(flight, series_names(data if data is not None else flight.data()))
+
+
+def forget_flight_series(flight):
+    """
+    Take a deleted flight out of the series catalog. The catalog does not keep
+    which earlier flight recorded a series last, so series last seen in flight are
+    pointed back at their first flight and the later flights are cataloged again
+    when recent_series_names reads them.
+    """
+    with transaction.atomic():
+        CatalogedFlight.objects.filter(flight_id=flight.id).delete()
+
+        series = AircraftSeries.objects.filter(aircraft_id=flight.aircraft_id, last_flight_id=flight.id)
+        series.filter(first_flight_id=flight.id).delete()
+        first = series.aggregate(first=Min('first_flight_id'))['first']
+        if first is not None:
+            series.update(last_flight_id=F('first_flight_id'))
+            CatalogedFlight.objects.filter(aircraft_id=flight.aircraft_id, flight_id__gt=first).delete()
+
+
+def recent_series_names(aircraft, flights=5):
+    """Names of the series recorded in the last flights of aircraft, from the series catalog."""
+    recent = Flight.objects.filter(aircraft=aircraft).order_by('-id').values_list('id', flat=True)[:flights]
+    recent = list(recent)
+    if not recent:
+        return []
+
+    # Flights ingested before the catalog existed, or whose cataloging failed
+    cataloged = set(CatalogedFlight.objects.filter(flight_id__in=recent).values_list('flight_id', flat=True))
+    for flight in Flight.objects.filter(id__in=set(recent) - cataloged):
+        catalog_flight_series(flight)
+
+    return list(AircraftSeries.objects.filter(aircraft=aircraft, last_flight_id__gte=recent[-1])
+                .values_list('name', flat=True))
+
+
+def flight_columns_dir():
+    """
+    Where flight columns are written, the FLIGHT_COLUMNS_DIR setting, or None when
+    it is not set and flights are only read from their data. The files are memory
+    mapped, so this is a local path, which every host serving flights must share
+    (a network mount): they are not in the storage backend the flight data is in.
+    """
+    return getattr(settings, 'FLIGHT_COLUMNS_DIR', None)
+
+
+def flight_columns_path(flight_id):
+    return os.path.join(flight_columns_dir(), '{}.cols'.format(flight_id))
+
+
+def build_flight_columns(flight, data=None):
+    """
+    Write the series of flight in the columnar format, next to the JSON it keeps
+    serving, from data, the flight data when it was read already. Returns the path
+    written, or None when FLIGHT_COLUMNS_DIR is not set.
+    """
+    if flight_columns_dir() is None:
+        return None
+
+    path = flight_columns_path(flight.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Readers must never map a partly written file
+    partial = path + '.partial'
+    with open(partial, 'wb') as output:
+        write_columns(output, columns_from_flight_data(data if data is not None else flight.data()))
+    os.replace(partial, path)
+    return path
+
+
+def remove_flight_columns(flight_id):
+    if flight_columns_dir() is None:
+        return
+    try:
+        os.remove(flight_columns_path(flight_id))
+    except FileNotFoundError:
+        pass
+
+
+def open_flight_columns(flight):
+    """The FlightColumns of flight, or None when they were not built."""
+    if flight_columns_dir() is None:
+        return None
+    try:
+        return FlightColumns(flight_columns_path(flight.id))
+    except FileNotFoundError:
+        return None
+
+
+def flight_series(flight, names):
+    """
+    {name: samples} of those of the numeric series names that flight recorded, as
+    float64 arrays (NaN for gaps) converted by the unit conversions of its aircraft.
+    They are read from the flight columns when they were built, which maps only
+    these series, and from the whole flight data otherwise.
+    """
+    plan = conversion_plan(flight.aircraft_id)
+    columns = open_flight_columns(flight)
+    if columns is None:
+        series = columns_from_flight_data(flight.data())
+        return plan.apply_all({name: series[name] for name in names if name in series})
+
+    with columns:
+        return plan.apply_all({name: columns.column(name) for name in names if name in columns})
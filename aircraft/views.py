@@ -1,26 +1,23 @@
 # Core
-import json
+import math
 from datetime import datetime
 
 # Django
 from django.contrib import messages
 from django.urls import reverse, reverse_lazy
 from django.forms import model_to_dict
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
-from django.db.models import Sum
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import ListView
 from django.utils.translation import ugettext as _
-from django.utils import timezone
 
 # Third-party
 from dal import autocomplete
 
 # App
 from account.models import (
-    AnalysisPack,
     APIToken,
 )
 
@@ -48,6 +45,8 @@ from aircraft.models import (
     Aircraft,
     AircraftConversion,
 )
+from aircraft.entitlements import entitlements_for, pack_summary
+from aircraft.utils import flight_series, recent_series_names
 from mx.models import MxAircraft
 from mx.utils import get_aircraft_from_mx_db
 
@@ -62,17 +61,13 @@ class AircraftListView(ListView):
     def get_context_data(self, **kwargs):
         # Call the base implementation first to get a context
         context = super(AircraftListView, self).get_context_data(**kwargs)
-        # Add in a QuerySet of all the books
-        packs = AnalysisPack.objects.filter(user=self.request.user)
-        if len(packs) == 0:
+        packs = pack_summary(self.request.user.id)
+        if packs.packs == 0:
             context['no_packs'] = True
+        elif packs.valid_packs == 0:
+            context['remaining_analyses'] = "no"
         else:
-            valid_packs = AnalysisPack.objects.filter(user=self.request.user, expiration_date__gte=timezone.now())
-            if len(valid_packs) == 0:
-                context['remaining_analyses'] = "no"
-            else:
-                context['remaining_analyses'] = valid_packs.aggregate(Sum('remaining_incidents'))[
-                    'remaining_incidents__sum']
+            context['remaining_analyses'] = packs.remaining_incidents
 
         return context
 
@@ -89,15 +84,7 @@ def aircraft_list_conversions(request, aircraft_id):
         return render(request, 'skeletons/basic.html', {'title': "Error", 'text': 'Aircraft does not exist.'})
 
     try:
-        most_recent_flights = Flight.objects.filter(aircraft=aircraft).order_by('id').reverse()
-        if len(most_recent_flights) >= 5:
-            most_recent_flights = most_recent_flights[0:5]
-
-        most_recent_flight_series = []
-        for flight in most_recent_flights:
-            data = json.loads(flight.data())
-            most_recent_flight_series += data['series_data'].keys()
-        most_recent_flight_series = list(set(most_recent_flight_series))
+        most_recent_flight_series = recent_series_names(aircraft)
 
         most_recent_flight_series_filtered = []
         for serie in most_recent_flight_series:
@@ -149,12 +136,25 @@ def aircraft_delete(request, aircraft_id):
     if request.method != 'POST':
         return HttpResponse('Unsupported')
 
-    if aircraft.current_subscription() is not None:
+    if entitlements_for(request).current_subscription(aircraft) is not None:
         return HttpResponse('Cannot delete an aircraft with an active subscription.')
     aircraft.delete()
     return HttpResponse("ok")
 
 
+@login_required
+def aircraft_flight_series(request, aircraft_id, flight_id):
+    """The converted samples of the series of a flight named by the series parameters, as JSON (gaps are null)."""
+    try:
+        flight = Flight.objects.get(id=flight_id, aircraft_id=aircraft_id, aircraft__user_id=request.user.id)
+    except Flight.DoesNotExist:
+        return JsonResponse({'error': 'Flight does not exist.'}, status=404)
+
+    series = flight_series(flight, request.GET.getlist('series'))
+    return JsonResponse({name: [None if math.isnan(value) else value for value in samples]
+                         for name, samples in series.items()})
+
+
 @login_required
 def complete_profile(request, aircraft_id, kind):
     # Kind will be "pack" or "pro".
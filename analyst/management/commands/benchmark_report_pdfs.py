@@ -0,0 +1,47 @@
+# Core
+import time
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# App
+from analyst import pdf_resources
+from analyst.models import FlightReport
+from analyst.reports import PdfReport
+
+
+class Command(BaseCommand):
+    help = ('Time rendering recent analysis reports one PDF each, with the explanation page cached '
+            'and rendered for every report, as it was before the cache.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=30, help='Most recent reports with content to render')
+        parser.add_argument('--rounds', type=int, default=3, help='Times each mode renders the batch; the best is kept')
+
+    def _render(self, report_ids, cached):
+        best = None
+        for _ in range(self.rounds):
+            PdfReport.explanation_pages = {}
+            start = time.perf_counter()
+            for report_id in report_ids:
+                if not cached:
+                    PdfReport.explanation_pages = {}
+                PdfReport(FlightReport.objects.filter(id=report_id), None).generate('0')
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        self.rounds = options['rounds']
+        report_ids = list(FlightReport.objects.with_content().order_by('-id')
+                          .values_list('id', flat=True)[:options['count']])
+        if not report_ids:
+            raise CommandError('There are no reports with content to render.')
+
+        # Fonts and the logo are loaded once per process either way
+        pdf_resources.warm_up()
+
+        for label, cached in (('rendered per report', False), ('cached', True)):
+            elapsed = self._render(report_ids, cached)
+            self.stdout.write('Explanation page {}: {:.1f} ms per report ({} reports, {:.2f} s)'.format(
+                label, elapsed * 1000 / len(report_ids), len(report_ids), elapsed))
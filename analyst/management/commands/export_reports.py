@@ -0,0 +1,42 @@
+# Core
+from datetime import datetime
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# App
+from analyst.utils import export_queryset, export_reports_pdf, export_reports_zip
+
+
+def _date(value):
+    return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+
+
+class Command(BaseCommand):
+    help = 'Render analysis reports into a zip of PDFs (one per ticket and flight) or a single combined PDF.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the .zip or .pdf file to write')
+        parser.add_argument('--reports', nargs='+', type=int, help='FlightReport ids')
+        parser.add_argument('--tickets', nargs='+', type=int, help='Ticket ids')
+        parser.add_argument('--from', dest='created_from', type=_date, help='Reports created on or after YYYY-MM-DD')
+        parser.add_argument('--to', dest='created_to', type=_date, help='Reports created before YYYY-MM-DD')
+        parser.add_argument('--processes', type=int, default=None, help='Rendering processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        if not any(options[key] for key in ('reports', 'tickets', 'created_from', 'created_to')):
+            raise CommandError('Select reports with --reports, --tickets and/or --from/--to.')
+
+        flight_reports = export_queryset(report_ids=options['reports'],
+                                         ticket_ids=options['tickets'],
+                                         created_from=options['created_from'],
+                                         created_to=options['created_to'])
+
+        if options['output'].endswith('.pdf'):
+            with open(options['output'], 'wb') as output:
+                count = export_reports_pdf(flight_reports, output)
+            self.stdout.write('Wrote {} reports to {}'.format(count, options['output']))
+        else:
+            count = export_reports_zip(flight_reports, options['output'], processes=options['processes'])
+            self.stdout.write('Wrote {} PDFs to {}'.format(count, options['output']))
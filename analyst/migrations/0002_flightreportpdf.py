@@ -0,0 +1,24 @@
+# Generated by Django 3.1.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyst', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightReportPdf',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=40, unique=True)),
+                ('pdf', models.FileField(upload_to='analyst/reports')),
+                ('size', models.PositiveIntegerField()),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_on', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
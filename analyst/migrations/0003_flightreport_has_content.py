@@ -0,0 +1,40 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+# analyst.models.CONTENT_FIELDS as of this migration
+CONTENT_FIELDS = (
+    'findings', 'recommendations', 'additional',
+    'gami_summary', 'gami1', 'gami2', 'gami3', 'gami4',
+    'ignition_summary', 'ignition1', 'ignition2', 'ignition3', 'ignition4',
+    'power_summary', 'power1', 'power2', 'power3', 'power4',
+    'temperatures_summary', 'temperatures1', 'temperatures2', 'temperatures3', 'temperatures4',
+    'electrical_summary', 'electrical1', 'electrical2', 'electrical3', 'electrical4',
+    'monitor_summary', 'monitor1', 'monitor2', 'monitor3', 'monitor4',
+    'powerplant_summary', 'powerplant1', 'powerplant2', 'powerplant3', 'powerplant4',
+)
+
+
+def set_has_content(apps, schema_editor):
+    FlightReport = apps.get_model('analyst', 'FlightReport')
+    q = models.Q()
+    for field in CONTENT_FIELDS:
+        q |= models.Q(**{field + '__isnull': False}) & ~models.Q(**{field: ''}) & ~models.Q(**{field: '0'})
+    FlightReport.objects.filter(q).update(has_content=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyst', '0002_flightreportpdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightreport',
+            name='has_content',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(set_has_content, migrations.RunPython.noop),
+    ]
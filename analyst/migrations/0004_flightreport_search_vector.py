@@ -0,0 +1,37 @@
+# Generated by Django 3.1.7 on 2026-10-18 15:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# analyst.models.SEARCH_FIELDS as of this migration
+SEARCH_FIELDS = (
+    ('findings', 'A'), ('recommendations', 'A'), ('additional', 'B'), ('gami4', 'B'),
+    ('ignition4', 'C'), ('power4', 'C'), ('temperatures4', 'C'), ('monitor4', 'C'),
+    ('powerplant4', 'C'), ('electrical4', 'C'),
+)
+
+SET_SEARCH_VECTOR = 'UPDATE analyst_flightreport SET search_vector = {}'.format(' || '.join(
+    "setweight(to_tsvector('english'::regconfig, COALESCE({}, '')), '{}')".format(field, weight)
+    for field, weight in SEARCH_FIELDS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyst', '0003_flightreport_has_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='flightreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='flightreport_search_gin'),
+        ),
+        migrations.RunSQL(SET_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
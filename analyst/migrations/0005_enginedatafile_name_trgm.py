@@ -0,0 +1,24 @@
+# Generated by Django 3.1.7 on 2026-10-18 16:02
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently so the files table stays writable
+    atomic = False
+
+    dependencies = [
+        ('analyst', '0004_flightreport_search_vector'),
+        ('files', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # Serves EngineDataFile name__icontains lookups, which compare UPPER(name)
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS files_enginedatafile_name_trgm '
+            'ON files_enginedatafile USING gin (UPPER(name) gin_trgm_ops)',
+            'DROP INDEX CONCURRENTLY IF EXISTS files_enginedatafile_name_trgm',
+        ),
+    ]
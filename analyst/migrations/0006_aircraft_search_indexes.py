@@ -0,0 +1,31 @@
+# Generated by Django 3.1.7 on 2026-10-18 16:48
+
+from django.conf import settings
+from django.db import migrations
+
+# Serve the istartswith lookups of the analyst aircraft search, which compare UPPER(column).
+# The registration_no index is created by aircraft 0005_aircraft_registration_no_prefix.
+SEARCH_INDEXES = (
+    ('account_user_first_name_prefix', 'account_user', 'first_name'),
+    ('account_user_last_name_prefix', 'account_user', 'last_name'),
+    ('account_user_email_prefix', 'account_user', 'email'),
+)
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently so the tables stay writable
+    atomic = False
+
+    dependencies = [
+        ('analyst', '0005_enginedatafile_name_trgm'),
+        ('aircraft', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} (UPPER({}) text_pattern_ops)'.format(*index),
+            'DROP INDEX CONCURRENTLY IF EXISTS {}'.format(index[0]),
+        )
+        for index in SEARCH_INDEXES
+    ]
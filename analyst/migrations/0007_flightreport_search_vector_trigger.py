@@ -0,0 +1,44 @@
+# Generated by Django 3.1.7 on 2026-10-18 21:40
+
+from django.db import migrations
+
+# analyst.models.SEARCH_FIELDS as of this migration
+SEARCH_FIELDS = (
+    ('findings', 'A'), ('recommendations', 'A'), ('additional', 'B'), ('gami4', 'B'),
+    ('ignition4', 'C'), ('power4', 'C'), ('temperatures4', 'C'), ('monitor4', 'C'),
+    ('powerplant4', 'C'), ('electrical4', 'C'),
+)
+
+# Compute search_vector in the row write itself, instead of an UPDATE after each save
+CREATE_TRIGGER = """
+CREATE FUNCTION analyst_flightreport_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER analyst_flightreport_search_vector
+    BEFORE INSERT OR UPDATE OF {fields} ON analyst_flightreport
+    FOR EACH ROW EXECUTE PROCEDURE analyst_flightreport_search_vector();
+""".format(
+    vector=' || '.join("setweight(to_tsvector('english'::regconfig, COALESCE(NEW.{}, '')), '{}')".format(field, weight)
+                       for field, weight in SEARCH_FIELDS),
+    fields=', '.join(field for field, _ in SEARCH_FIELDS),
+)
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS analyst_flightreport_search_vector ON analyst_flightreport;
+DROP FUNCTION IF EXISTS analyst_flightreport_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyst', '0006_aircraft_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -3,7 +3,11 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Django
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, ExpressionWrapper, F, Q, Value
+from django.db.models.functions import Concat
 
 # Third-Party
 
@@ -12,6 +16,76 @@ from django.db import models
 
 SUMMARY_CHECKBOXES = [(0, 'Select a value'), ('Satisfactory', 'Satisfactory'), ('Caution', 'Caution'), ('Alert', 'Alert'), ('N/A', 'N/A')]
 
+# The FlightReport fields that make a report worth rendering when any of them is filled in
+CONTENT_FIELDS = (
+    'findings', 'recommendations', 'additional',
+    'gami_summary', 'gami1', 'gami2', 'gami3', 'gami4',
+    'ignition_summary', 'ignition1', 'ignition2', 'ignition3', 'ignition4',
+    'power_summary', 'power1', 'power2', 'power3', 'power4',
+    'temperatures_summary', 'temperatures1', 'temperatures2', 'temperatures3', 'temperatures4',
+    'electrical_summary', 'electrical1', 'electrical2', 'electrical3', 'electrical4',
+    'monitor_summary', 'monitor1', 'monitor2', 'monitor3', 'monitor4',
+    'powerplant_summary', 'powerplant1', 'powerplant2', 'powerplant3', 'powerplant4',
+)
+
+# Long free text fields, left out of the querysets that list reports
+TEXT_FIELDS = ('client_comments', 'findings', 'recommendations', 'additional', 'gami1', 'gami2', 'gami3', 'gami4')
+
+# The analyst prose indexed by FlightReport.search_vector, with its search weight.
+# The vector is computed by the analyst_flightreport_search_vector trigger (migration
+# 0007), so changing these takes a migration that replaces it.
+SEARCH_FIELDS = (
+    ('findings', 'A'), ('recommendations', 'A'), ('additional', 'B'), ('gami4', 'B'),
+    ('ignition4', 'C'), ('power4', 'C'), ('temperatures4', 'C'), ('monitor4', 'C'),
+    ('powerplant4', 'C'), ('electrical4', 'C'),
+)
+SEARCH_CONFIG = 'english'
+
+# What search() snippets mark the matches with, control characters that report text
+# does not contain, so the snippet can be escaped before the marks become markup
+HEADLINE_START = '\x02'
+HEADLINE_STOP = '\x03'
+
+
+def content_q():
+    """FlightReport.not_empty() as a filter, for reports loaded from the database."""
+    q = Q()
+    for field in CONTENT_FIELDS:
+        q |= Q(**{field + '__isnull': False}) & ~Q(**{field: ''}) & ~Q(**{field: '0'})
+    return q
+
+
+class FlightReportQuerySet(models.QuerySet):
+    def with_content(self):
+        """
+        Reports with content, by the has_content that save() stores. A queryset
+        .update() of the content fields leaves it stale; see annotate_content.
+        """
+        return self.filter(has_content=True)
+
+    def listing(self):
+        """Reports without their text fields, which are loaded on access."""
+        return self.defer(*TEXT_FIELDS)
+
+    def search(self, text):
+        """
+        Reports matching text, best first, annotated with their rank and a snippet
+        of their findings and recommendations, the matches between HEADLINE_START
+        and HEADLINE_STOP.
+        """
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        prose = Concat(F('findings'), Value(' '), F('recommendations'))
+        return self.filter(search_vector=query) \
+            .annotate(rank=SearchRank(F('search_vector'), query),
+                      snippet=SearchHeadline(prose, query, config=SEARCH_CONFIG, max_fragments=2,
+                                             start_sel=HEADLINE_START, stop_sel=HEADLINE_STOP)) \
+            .order_by('-rank', '-created_on')
+
+    def annotate_content(self):
+        """Annotate content, computed from the report fields in SQL, unlike the stored has_content."""
+        return self.annotate(content=ExpressionWrapper(content_q(), output_field=BooleanField()))
+
+
 class FlightReport(models.Model):
     ticket = models.ForeignKey("tickets.TicketRequest", null=True, blank=True, on_delete=models.PROTECT)
     engine = models.IntegerField(verbose_name='Engine') # 0 Single, 1 Left, 2 Right
@@ -70,9 +144,36 @@ class FlightReport(models.Model):
     recommendations = models.TextField(max_length=2000, default="", blank=True, verbose_name='Recommendations')
     additional = models.TextField(max_length=10000, default="", blank=True, verbose_name='Additional Remarks')
 
+    # not_empty(), kept up to date by save() so empty reports can be filtered out in SQL
+    has_content = models.BooleanField(default=False, db_index=True)
+
+    # Full-text index of the SEARCH_FIELDS, computed by a database trigger on every write of them
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = FlightReportQuerySet.as_manager()
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='flightreport_search_gin')]
+
     @staticmethod
     def exists(field):
         return field is not None and field != "" and field != '0'
 
     def not_empty(self):
-        return self.exists(self.findings) or self.exists(self.recommendations) or self.exists(self.additional) or self.exists(self.gami_summary) or self.exists(self.gami1) or self.exists(self.gami2) or self.exists(self.gami3) or self.exists(self.gami4) or self.exists(self.ignition_summary)or self.exists(self.ignition1) or self.exists(self.ignition2) or self.exists(self.ignition3) or self.exists(self.ignition4) or self.exists(self.power_summary) or self.exists(self.power1) or self.exists(self.power2) or self.exists(self.power3) or self.exists(self.power4) or self.exists(self.temperatures_summary) or self.exists(self.temperatures1) or self.exists(self.temperatures2) or self.exists(self.temperatures3) or self.exists(self.temperatures4) or self.exists(self.electrical_summary) or self.exists(self.electrical1) or self.exists(self.electrical2) or self.exists(self.electrical3) or self.exists(self.electrical4) or self.exists(self.monitor_summary) or self.exists(self.monitor1) or self.exists(self.monitor2) or self.exists(self.monitor3) or self.exists(self.monitor4) or self.exists(self.powerplant_summary) or self.exists(self.powerplant1) or self.exists(self.powerplant2) or self.exists(self.powerplant3) or self.exists(self.powerplant4)
+        return any(self.exists(getattr(self, field)) for field in CONTENT_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.has_content = self.not_empty()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(CONTENT_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'has_content'}
+        super().save(*args, **kwargs)
+
+
+class FlightReportPdf(models.Model):
+    # Rendered PdfReport output, addressed by a hash of everything printed in it
+    content_hash = models.CharField(max_length=40, unique=True)
+    pdf = models.FileField(upload_to='analyst/reports')
+    size = models.PositiveIntegerField()
+    created_on = models.DateTimeField(auto_now_add=True)
+    last_accessed_on = models.DateTimeField(db_index=True)
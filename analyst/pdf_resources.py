@@ -0,0 +1,78 @@
+# Django
+from django.conf import settings
+
+# Third-Party
+import fpdf
+
+# Parsed TTF metrics and image streams, shared by every fpdf document created in
+# this process. fpdf mutates the per-document copies (subsets, object numbers), so
+# documents always get their own copy of the dicts kept here.
+_fonts = {}
+_images = {}
+
+REPORT_FONTS = (
+    ('DejaVu', 'DejaVuSansCondensed.ttf'),
+    ('DejaVuBold', 'DejaVuSansCondensed-Bold.ttf'),
+)
+
+
+def logo_path():
+    return settings.PROJECT_DIR + '/templates/analyst/SavvyLogo.jpg'
+
+
+def _load_font(family, file_name):
+    fpdf.set_global('FPDF_FONT_DIR', str(settings.PROJECT_DIR.ancestor(1).child('fonts')) )
+    fpdf.set_global('FPDF_CACHE_MODE', 1)
+
+    scratch = fpdf.FPDF('P', 'cm', 'Letter')
+    scratch.add_font(family, '', file_name, uni=True)
+    fontkey = family.lower()
+    return scratch.fonts[fontkey], scratch.font_files
+
+
+def add_font(pdf, family, file_name):
+    """
+    Same as pdf.add_font(family, '', file_name, uni=True), but the TTF file is
+    only read and parsed the first time a process uses it.
+    """
+    fontkey = family.lower()
+    if fontkey in pdf.fonts:
+        return
+
+    if fontkey not in _fonts:
+        _fonts[fontkey] = _load_font(family, file_name)
+    font, font_files = _fonts[fontkey]
+
+    pdf.fonts[fontkey] = dict(font, i=len(pdf.fonts) + 1, subset=list(font['subset']))
+    for key, font_file in font_files.items():
+        pdf.font_files[key] = dict(font_file)
+
+
+def _load_image(name):
+    scratch = fpdf.FPDF('P', 'cm', 'Letter')
+    scratch.add_page()
+    scratch.image(name, 0, 0, 1, 1)
+    return scratch.images[name]
+
+
+def image(pdf, name, x=None, y=None, w=0, h=0):
+    """Same as pdf.image(name, x, y, w, h), decoding the file once per process."""
+    if name not in pdf.images:
+        if name not in _images:
+            _images[name] = _load_image(name)
+        pdf.images[name] = dict(_images[name], i=len(pdf.images) + 1)
+
+    pdf.image(name, x, y, w, h)
+
+
+def warm_up():
+    """
+    Load the report fonts and logo ahead of the first report, e.g. from a gunicorn
+    post_fork hook (or on_starting with preload_app, so workers share them).
+    """
+    for family, file_name in REPORT_FONTS:
+        if family.lower() not in _fonts:
+            _fonts[family.lower()] = _load_font(family, file_name)
+
+    if logo_path() not in _images:
+        _images[logo_path()] = _load_image(logo_path())
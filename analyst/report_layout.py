@@ -0,0 +1,119 @@
+# Core
+from collections import namedtuple
+from datetime import datetime
+
+# App
+from analyst.models import CONTENT_FIELDS, FlightReport
+
+# Layout of the analysis detail part of a flight report, resolved from the
+# FlightReport field groups once at import. PdfReport renders from it, and other
+# output formats can reuse it.
+
+# Traffic light summary values and their fill colors
+TRAFFIC_COLORS = {
+    'Satisfactory': (0, 255, 0),
+    'Caution': (255, 230, 48),
+    'Alert': (255, 115, 115),
+    '0': (230, 230, 230),
+    'N/A': (230, 230, 230),
+}
+
+# A titled group of fields with a traffic light summary; fields are (name, label) pairs
+Section = namedtuple('Section', ['title', 'summary_field', 'fields'])
+
+
+def _label(name):
+    return FlightReport._meta.get_field(name).verbose_name
+
+
+def _section(group):
+    names = ['{}{}'.format(group, number) for number in range(1, 5)]
+    return Section(title=_label(group + '_summary'),
+                   summary_field=group + '_summary',
+                   fields=tuple((name, _label(name)) for name in names))
+
+
+def summary(section, flight_report):
+    return getattr(flight_report, section.summary_field)
+
+
+def data_lines(section, flight_report):
+    """[label, value] lines of a data box section, as PdfReport._data_box takes them."""
+    return [[label + ": ", getattr(flight_report, name)] for name, label in section.fields]
+
+
+# The GAMI lean test: three sweeps and the observations, side by side
+GAMI_SECTION = _section('gami')
+
+# The data boxes, as (left, right) rows from the top of the page down
+DATA_BOX_ROWS = (
+    (_section('ignition'), _section('power')),
+    (_section('temperatures'), _section('monitor')),
+    (_section('powerplant'), _section('electrical')),
+)
+
+
+# Every FlightReport field a report prints, besides the client comments (see client_comments)
+PRINTED_FIELDS = ('engine',) + CONTENT_FIELDS
+
+
+def traffic_light(value, gami=False):
+    """(fill color, text) of a summary traffic light; the color is None for values without one."""
+    if value == "0" or value == "N/A":
+        value = "Not Applicable" if not gami else "N/A (no usable mixture sweeps observed)"
+        return TRAFFIC_COLORS['N/A'], value
+    return TRAFFIC_COLORS.get(value), value
+
+
+def _date_only(a_date):
+    return a_date.strftime("%Y-%m-%d")
+
+
+def _name(instance):
+    return instance.name if instance is not None else ""
+
+
+def header_columns(flight_report, subscription):
+    """
+    The report header as three columns of (heading, text) rows. subscription is
+    the current subscription of the report's aircraft, or None.
+    """
+    flight = flight_report.flight
+    aircraft = flight.aircraft
+
+    client = [
+        ("Client:", "%s %s" % (aircraft.user.first_name, aircraft.user.last_name)),
+        ("Aircraft:", "%s" % aircraft.registration_no),
+        ("Flight:", "%s" % _date_only(flight.date)),
+    ]
+
+    equipment = [
+        ("A/C Type:", "%s %s" % (_name(aircraft.aircraft_manufacturer), _name(aircraft.aircraft_model))),
+        ("Engine:", "%s %s" % (_name(aircraft.engine_manufacturer), _name(aircraft.engine_model))),
+        ("Monitor:", "%s %s" % (_name(aircraft.engine_monitor_manufacturer), _name(aircraft.engine_monitor_model))),
+    ]
+
+    if subscription is not None:
+        subscription_text = "Subscr. ends: %s" % _date_only(subscription.end_date)
+    else:
+        subscription_text = "SavvyMx client"
+
+    report = [
+        ("Report Date:", "%s" % _date_only(datetime.utcnow())),
+        ("", subscription_text),
+    ]
+    if flight_report.engine == 0:
+        report.append(("", ""))
+    else:
+        report.append(("Engine Position:", "Left" if flight_report.engine == 1 else "Right"))
+
+    return [client, equipment, report]
+
+
+def client_comments(flight_report, ticket_body):
+    """The client comments section text, taken from the ticket when there is one."""
+    if ticket_body is not None:
+        return ticket_body.replace('\n', ' ')
+    if flight_report.client_comments is None:
+        return "N/A"
+    return flight_report.client_comments.replace('\n', ' ')
@@ -1,30 +1,78 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from datetime import datetime
 from django.conf import settings
 from django.utils.encoding import smart_str
 from django.utils import timezone
+from django.template.loader import render_to_string
 
 import fpdf
 
+from aircraft.entitlements import Entitlements
+from analyst import pdf_resources, report_layout
+from analyst.text_metrics import metrics_for
+
 min_font_size = 8
 
+# Size of the pieces a streamed report is encoded and sent in
+stream_chunk_size = 64 * 1024
+
 savvy_r = 182
 savvy_g = 40
 savvy_b = 32
 
+# Everything _header prints, joined into the query that loads the reports
+header_related = ('flight__aircraft__user',
+                  'flight__aircraft__aircraft_manufacturer',
+                  'flight__aircraft__aircraft_model',
+                  'flight__aircraft__engine_manufacturer',
+                  'flight__aircraft__engine_model',
+                  'flight__aircraft__engine_monitor_manufacturer',
+                  'flight__aircraft__engine_monitor_model')
+
+# FPDF attributes left behind by the explanation page, restored after copying it
+explanation_state = ('font_family', 'font_style', 'font_size_pt', 'font_size', 'underline', 'unifontsubset',
+                     'text_color', 'x', 'y', 'lasth')
+
+def content_disposition(flight_report):
+    """Content-Disposition of the PDF of flight_report, from its header data (see header_related)."""
+    aircraft = flight_report.flight.aircraft
+    file_name = 'attachment; filename="%s %s %s %s.pdf"' % (datetime.utcnow().strftime("%Y-%m-%d"), aircraft.user.first_name.strip().replace("\"", ''), aircraft.user.last_name.strip().replace("\"", ''), aircraft.registration_no)
+    return file_name.encode("ascii", "replace").replace(b"?", b"X")
+
+
 class PdfReport(): # pragma: no cover
-    def __init__(self, flight_reports, ticket_body):
+    # Content streams of the explanation page by fill color, see add_explanation
+    explanation_pages = {}
+
+    def __init__(self, flight_reports, ticket_body, stream=False, entitlements=None, ticket_bodies=None):
+        if hasattr(flight_reports, 'select_related'):
+            flight_reports = flight_reports.select_related(*header_related)
         self.flight_reports = flight_reports
-        self.response = HttpResponse(content_type='application/pdf')
+        # Ticket id to ticket body, instead of ticket_body, for documents covering several tickets
+        self.ticket_bodies = ticket_bodies
+        # Current subscriptions, looked up once per render (or request)
+        self.entitlements = entitlements if entitlements is not None else Entitlements()
+        if stream:
+            self.response = StreamingHttpResponse(content_type='application/pdf')
+        else:
+            self.response = HttpResponse(content_type='application/pdf')
         self.ticket_body = ticket_body
 
         # self.canvas = canvas.Canvas(self.response, pagesize=letter)
         # self.width, self.height = letter
 
 
+    def _new_document(self):
+        self.pdf = fpdf.FPDF('P', 'cm', 'Letter')
+
+        for family, file_name in pdf_resources.REPORT_FONTS:
+            pdf_resources.add_font(self.pdf, family, file_name)
+
+        self.pdf.set_auto_page_break(0)
+
     def _title(self):
         ## Logo
-        self.pdf.image(settings.PROJECT_DIR + '/templates/analyst/SavvyLogo.jpg', 1, 0.76, 6, 1.44)
+        pdf_resources.image(self.pdf, pdf_resources.logo_path(), 1, 0.76, 6, 1.44)
 
         ## Title
         self.pdf.set_font('DejaVuBold','',16)
@@ -40,6 +88,17 @@ class PdfReport(): # pragma: no cover
         self.pdf.line(1, 2.2, 20.59, 2.2)
         return 2.2
 
+    def _current_subscription(self, aircraft):
+        return self.entitlements.current_subscription(aircraft)
+
+    def _load_subscriptions(self):
+        self.entitlements.load(aircraft_ids=[r.flight.aircraft_id for r in self.flight_reports])
+
+    def _ticket_body(self, flight_report):
+        if self.ticket_bodies is not None:
+            return self.ticket_bodies.get(flight_report.ticket_id)
+        return self.ticket_body
+
     def _date_only(self, a_date):
         return a_date.strftime("%Y-%m-%d")
 
@@ -88,110 +147,22 @@ class PdfReport(): # pragma: no cover
             self.pdf.cell(remaining_width if w1 != 0 else column_width-margin, 0, r3, ln=1)
 
 
-        head1 = "Client:"
-        head2 = "Aircraft:"
-        head3 = "Flight:"
-
-        this_flight = flight_report.flight
-
-        row1 = "%s %s" % (this_flight.aircraft.user.first_name, this_flight.aircraft.user.last_name )
-        row2 = "%s" % this_flight.aircraft.registration_no
-        row3 = "%s" % self._date_only(this_flight.date)
-
-        create_set(head1, head2, head3, row1, row2, row3, 0)
-
-        head1 = "A/C Type:"
-        head2 = "Engine:"
-        head3 = "Monitor:"
-
-        row1 = "%s %s" % (this_flight.aircraft.aircraft_manufacturer.name if this_flight.aircraft.aircraft_manufacturer is not None else "", this_flight.aircraft.aircraft_model.name if this_flight.aircraft.aircraft_model is not None else "")
-        row2 = "%s %s" % (this_flight.aircraft.engine_manufacturer.name if this_flight.aircraft.engine_manufacturer is not None else "", this_flight.aircraft.engine_model.name if this_flight.aircraft.engine_model else "")
-        row3 = "%s %s" % (this_flight.aircraft.engine_monitor_manufacturer.name if this_flight.aircraft.engine_monitor_manufacturer else "", this_flight.aircraft.engine_monitor_model.name if this_flight.aircraft.engine_monitor_model else "" )
-
-        create_set(head1, head2, head3, row1, row2, row3, column_width)
-
-        head1 = "Report Date:"
-        head2 = ""
-
-
-        if flight_report.engine == 0:
-            head3 = ""
-            row1 = "%s" % self._date_only(datetime.utcnow())
-            if this_flight.aircraft.current_subscription() is not None:
-                row2 = "Subscr. ends: %s" % self._date_only(this_flight.aircraft.current_subscription().end_date)
-                row3 = ""
-            else:
-                row2 = "SavvyMx client"
-                row3 = ""
-        else:
-            head3 = "Engine Position:"
-            row1 = "%s" % self._date_only(datetime.utcnow())
-            if this_flight.aircraft.current_subscription() is not None:
-                row2 = "Subscr. ends: %s" % self._date_only(this_flight.aircraft.current_subscription().end_date)
-            else:
-                row2 = "SavvyMx client"
-            row3 = "Left" if flight_report.engine == 1 else "Right"
-
-        create_set(head1, head2, head3, row1, row2, row3, column_width * 2)
+        columns = report_layout.header_columns(flight_report, self._current_subscription(flight_report.flight.aircraft))
+        for index, column in enumerate(columns):
+            heads = [head for head, _ in column]
+            rows = [row for _, row in column]
+            create_set(*(heads + rows), h_offset=column_width * index)
 
         return start_height + 3 * row_height
 
     def _font_size_to_fit(self, text, minimum, maximum, width):
-        font_size = maximum
-        while True:
-            self.pdf.set_font_size(font_size)
-            if self.pdf.get_string_width(text) <= width:
-                break
-            if font_size <= minimum:
-                return font_size
-            else:
-                font_size = max(font_size-1, minimum)
-            if text == "":
-                break
-
+        font_size = metrics_for(self.pdf).font_size_to_fit(text, minimum, maximum, width, self.pdf.k)
+        self.pdf.set_font_size(font_size)
         return font_size
 
     def _crop_text_to_fit(self, text, font_size, line_width, line_count):
-
         self.pdf.set_font_size(font_size)
-        resulting_lines = [""]
-        remaining_lines = line_count
-        remaining_line_space = line_width
-        words = text.split(' ')
-        current_word = 0
-
-        while remaining_lines > 0 and current_word < len(words):
-            word_width = self.pdf.get_string_width(words[current_word] + " ")
-            if word_width <= remaining_line_space - 0.2:
-                remaining_line_space -= word_width
-                resulting_lines[-1] += words[current_word] + " "
-                current_word += 1
-            else:
-                resulting_lines[-1] = resulting_lines[-1].strip()
-                resulting_lines.append("")
-                remaining_lines -= 1
-                remaining_line_space = line_width
-
-        if resulting_lines[-1] == "":
-            resulting_lines = resulting_lines[0:-1]
-
-        if remaining_lines == 0 and current_word < len(words):
-            resulting_lines[-1] += " "  + words[current_word]
-            while True:
-
-                if self.pdf.get_string_width(resulting_lines[-1]) + 0.2 < line_width:
-                    break
-
-                if resulting_lines[-1] == "...":
-                    break
-                elif resulting_lines[-1].endswith('...'):
-                    resulting_lines[-1] = resulting_lines[-1][0:-4]
-                else:
-                    resulting_lines[-1] = resulting_lines[-1][0:-1]
-                resulting_lines[-1] += "..."
-
-        return_text = "\n".join(resulting_lines)
-        return return_text.strip()
+        return metrics_for(self.pdf).crop_text_to_fit(text, font_size, line_width, line_count, self.pdf.k)
 
     def _section_heading(self, x, y, text):
         self.pdf.set_font('DejaVuBold','', 10)
@@ -223,15 +194,9 @@ class PdfReport(): # pragma: no cover
         padding = 0.5
 
 
-        if value == "Satisfactory":
-            self.pdf.set_fill_color(0, 255, 0)
-        elif value == "Caution":
-            self.pdf.set_fill_color(255, 230, 48)
-        elif value == "Alert":
-            self.pdf.set_fill_color(255, 115, 115)
-        elif value == "0" or value == "N/A":
-            self.pdf.set_fill_color(230, 230, 230)
-            value = "Not Applicable" if not gami else "N/A (no usable mixture sweeps observed)"
+        color, value = report_layout.traffic_light(value, gami)
+        if color is not None:
+            self.pdf.set_fill_color(*color)
 
         width = self.pdf.get_string_width(value)
         self.pdf.set_xy(x - width - padding, y)
@@ -297,6 +262,48 @@ class PdfReport(): # pragma: no cover
             self.pdf.line(x + box_width + box_margin * 0.5, top, x + box_width + box_margin * 0.5, top + 3.5 )
 
     def add_explanation(self):
+        self.pdf.add_page()
+        self.pdf.set_margins(1, 1, 1)
+
+        pdf_resources.image(self.pdf, pdf_resources.logo_path(), 1, 0.3, 6, 1.44)
+
+        # Everything below the logo is the same on every report, so the page content
+        # is rendered once per process and copied in. Text is drawn differently when
+        # the fill color matches the text color, so it is rendered per fill color.
+        explanation = self._explanation_page(self.pdf.fill_color)
+
+        self.pdf.pages[self.pdf.page] += explanation['content']
+        for fontkey, codepoints in explanation['subsets'].items():
+            self.pdf.fonts[fontkey]['subset'] += codepoints
+
+        for attribute, value in explanation['state'].items():
+            setattr(self.pdf, attribute, value)
+        self.pdf.current_font = self.pdf.fonts[self.pdf.font_family + self.pdf.font_style]
+        self.pdf.color_flag = self.pdf.fill_color != self.pdf.text_color
+
+    @classmethod
+    def _explanation_page(cls, fill_color):
+        if fill_color not in cls.explanation_pages:
+            report = cls(None, None)
+            report._new_document()
+            report.pdf.add_page()
+            report.pdf.set_margins(1, 1, 1)
+            report.pdf.fill_color = fill_color
+
+            start = len(report.pdf.pages[report.pdf.page])
+            subset_starts = {fontkey: len(font['subset']) for fontkey, font in report.pdf.fonts.items()}
+
+            report._explanation_body()
+
+            cls.explanation_pages[fill_color] = {
+                'content': report.pdf.pages[report.pdf.page][start:],
+                'subsets': {fontkey: sorted(set(font['subset'][subset_starts[fontkey]:]))
+                            for fontkey, font in report.pdf.fonts.items()},
+                'state': {attribute: getattr(report.pdf, attribute) for attribute in explanation_state},
+            }
+        return cls.explanation_pages[fill_color]
+
+    def _explanation_body(self):
 
         def explanation_title(title):
             self.pdf.set_text_color(54, 95, 145)
@@ -338,11 +345,6 @@ class PdfReport(): # pragma: no cover
             self.pdf.multi_cell(19.59, 0.42, text, align='L', border = 1 )
 
 
-        self.pdf.add_page()
-        self.pdf.set_margins(1, 1, 1)
-
-        self.pdf.image(settings.PROJECT_DIR + '/templates/analyst/SavvyLogo.jpg', 1, 0.3, 6, 1.44)
-
         ## Title
         self.pdf.set_font('DejaVuBold','',14)
         self.pdf.set_text_color(savvy_r, savvy_g, savvy_b)
@@ -442,7 +444,7 @@ class PdfReport(): # pragma: no cover
         self.pdf.add_page()
         self.pdf.set_margins(1, 1, 1)
 
-        self.pdf.image(settings.PROJECT_DIR + '/templates/analyst/SavvyLogo.jpg', 1, 0.3, 6, 1.44)
+        pdf_resources.image(self.pdf, pdf_resources.logo_path(), 1, 0.3, 6, 1.44)
 
         ## Title
         self.pdf.set_font('DejaVuBold','',14)
@@ -476,25 +478,15 @@ class PdfReport(): # pragma: no cover
         explanation_text(additional)
 
 
-    def generate(self, attachment):
+    def content_disposition(self):
+        return content_disposition(self.flight_reports.first())
 
-        first_flight = self.flight_reports.first().flight
+    def generate(self, attachment):
 
         if attachment == '1':
-            file_name = 'attachment; filename="%s %s %s %s.pdf"' % (self._date_only(datetime.utcnow()), first_flight.aircraft.user.first_name.strip().replace("\"", ''), first_flight.aircraft.user.last_name.strip().replace("\"", ''), first_flight.aircraft.registration_no)
-            self.response['Content-Disposition'] = file_name.encode("ascii", "replace").replace(b"?", b"X")
-        fpdf.set_global('FPDF_FONT_DIR', str(settings.PROJECT_DIR.ancestor(1).child('fonts')) )
-        fpdf.set_global('FPDF_CACHE_MODE', 1)
-
-
-        self.pdf = fpdf.FPDF('P', 'cm', 'Letter')
-
-
-        self.pdf.add_font('DejaVu', '', 'DejaVuSansCondensed.ttf', uni=True)
-        self.pdf.add_font('DejaVuBold', '', 'DejaVuSansCondensed-Bold.ttf', uni=True)
-
-        self.pdf.set_auto_page_break(0)
-
+            self.response['Content-Disposition'] = self.content_disposition()
+        self._new_document()
+        self._load_subscriptions()
 
         for flight_report in self.flight_reports:
 
@@ -513,13 +505,7 @@ class PdfReport(): # pragma: no cover
             # Client Comments
             self.pdf.line(1, top, 20.59, top)
             top += self._section_heading(1, top, "Client Comments")
-            if self.ticket_body is not None:
-                top += self._section_text(1, top, self.ticket_body.replace('\n', ' '))
-            else:
-                if flight_report.client_comments is None:
-                    top += self._section_text(1, top, smart_str("N/A"))
-                else:
-                    top += self._section_text(1, top, smart_str(flight_report.client_comments.replace('\n', ' ')))
+            top += self._section_text(1, top, smart_str(report_layout.client_comments(flight_report, self._ticket_body(flight_report))))
 
             # Summary of Findings
 
@@ -535,14 +521,15 @@ class PdfReport(): # pragma: no cover
             top += 0.1
 
             gami_top = top
-            top += self._section_heading(1, top, "GAMI Lean Test")
+            top += self._section_heading(1, top, report_layout.GAMI_SECTION.title)
 
-            self._traffic(20.59, gami_top, flight_report.gami_summary, gami=True)
+            self._traffic(20.59, gami_top, report_layout.summary(report_layout.GAMI_SECTION, flight_report), gami=True)
 
-            self._gami_box(top, 1, "Sweep #1", flight_report.gami1)
-            self._gami_box(top, 2, "Sweep #2", flight_report.gami2)
-            self._gami_box(top, 3, "Sweep #3", flight_report.gami3)
-            self._gami_box(top, 4, "Observations", flight_report.gami4.replace('\n', ' '), crop=True)
+            sweeps = report_layout.GAMI_SECTION.fields
+            for number, (name, label) in enumerate(sweeps[:-1], start=1):
+                self._gami_box(top, number, label, getattr(flight_report, name))
+            name, label = sweeps[-1]
+            self._gami_box(top, len(sweeps), label, getattr(flight_report, name).replace('\n', ' '), crop=True)
             top += 4
 
             # Data Boxes
@@ -554,60 +541,16 @@ class PdfReport(): # pragma: no cover
             self.pdf.line(1, top, 20.59, top)
             top += 0.1
 
-            data = list()
-            data.append ([ flight_report._meta.get_field('ignition1').verbose_name + ": ", flight_report.ignition1 ])
-            data.append ([ flight_report._meta.get_field('ignition2').verbose_name + ": ", flight_report.ignition2 ])
-            data.append ([ flight_report._meta.get_field('ignition3').verbose_name + ": ", flight_report.ignition3 ])
-            data.append ([ flight_report._meta.get_field('ignition4').verbose_name + ": ", flight_report.ignition4 ])
-            self._data_box(1, top, "Ignition", flight_report.ignition_summary, data )
-
-            data = list()
-            data.append ([ flight_report._meta.get_field('power1').verbose_name + ": ", flight_report.power1 ])
-            data.append ([ flight_report._meta.get_field('power2').verbose_name + ": ", flight_report.power2 ])
-            data.append ([ flight_report._meta.get_field('power3').verbose_name + ": ", flight_report.power3 ])
-            data.append ([ flight_report._meta.get_field('power4').verbose_name + ": ", flight_report.power4 ])
-            self._data_box(1 + right_offset, top, "Max Power", flight_report.power_summary, data )
-
-            self.pdf.line(21.59 / 2, top + line_top_adjust, 21.59 / 2, top + box_height - line_bottom_adjust)
-
-            top += box_height
-            self.pdf.line(1, top - 0.2, 20.59, top - 0.2)
-            data = list()
-            data.append ([ flight_report._meta.get_field('temperatures1').verbose_name + ": ", flight_report.temperatures1 ])
-            data.append ([ flight_report._meta.get_field('temperatures2').verbose_name + ": ", flight_report.temperatures2 ])
-            data.append ([ flight_report._meta.get_field('temperatures3').verbose_name + ": ", flight_report.temperatures3 ])
-            data.append ([ flight_report._meta.get_field('temperatures4').verbose_name + ": ", flight_report.temperatures4 ])
-            self._data_box(1, top, "Temperatures", flight_report.temperatures_summary, data )
-
-            data = list()
-            data.append ([ flight_report._meta.get_field('monitor1').verbose_name + ": ", flight_report.monitor1 ])
-            data.append ([ flight_report._meta.get_field('monitor2').verbose_name + ": ", flight_report.monitor2 ])
-            data.append ([ flight_report._meta.get_field('monitor3').verbose_name + ": ", flight_report.monitor3 ])
-            data.append ([ flight_report._meta.get_field('monitor4').verbose_name + ": ", flight_report.monitor4 ])
-            self._data_box(1 + right_offset, top, "Engine Monitor", flight_report.monitor_summary, data )
-
-            self.pdf.line(21.59 / 2, top + line_top_adjust, 21.59 / 2, top + box_height - line_bottom_adjust)
-
-            top += box_height
-            self.pdf.line(1, top - 0.2, 20.59, top - 0.2)
-            data = list()
-            data.append ([ flight_report._meta.get_field('powerplant1').verbose_name + ": ", flight_report.powerplant1 ])
-            data.append ([ flight_report._meta.get_field('powerplant2').verbose_name + ": ", flight_report.powerplant2 ])
-            data.append ([ flight_report._meta.get_field('powerplant3').verbose_name + ": ", flight_report.powerplant3 ])
-            data.append ([ flight_report._meta.get_field('powerplant4').verbose_name + ": ", flight_report.powerplant4 ])
-            self._data_box(1, top, "Powerplant Mgt", flight_report.powerplant_summary, data )
-
-            data = list()
-            data.append ([ flight_report._meta.get_field('electrical1').verbose_name + ": ", flight_report.electrical1 ])
-            data.append ([ flight_report._meta.get_field('electrical2').verbose_name + ": ", flight_report.electrical2 ])
-            data.append ([ flight_report._meta.get_field('electrical3').verbose_name + ": ", flight_report.electrical3 ])
-            data.append ([ flight_report._meta.get_field('electrical4').verbose_name + ": ", flight_report.electrical4 ])
-            self._data_box(1 + right_offset, top, "Electrical", flight_report.electrical_summary, data )
-
-            self.pdf.line(21.59 / 2, top + line_top_adjust, 21.59 / 2, top + box_height - line_bottom_adjust)
-
-            top += box_height
-            self.pdf.line(1, top - 0.2, 20.59, top - 0.2)
+            for left, right in report_layout.DATA_BOX_ROWS:
+                self._data_box(1, top, left.title, report_layout.summary(left, flight_report),
+                               report_layout.data_lines(left, flight_report))
+                self._data_box(1 + right_offset, top, right.title, report_layout.summary(right, flight_report),
+                               report_layout.data_lines(right, flight_report))
+
+                self.pdf.line(21.59 / 2, top + line_top_adjust, 21.59 / 2, top + box_height - line_bottom_adjust)
+
+                top += box_height
+                self.pdf.line(1, top - 0.2, 20.59, top - 0.2)
             #top += 0.1
 
             top += self._section_heading(1, top, "Recommendations:")
@@ -624,5 +567,71 @@ class PdfReport(): # pragma: no cover
 
         self.add_explanation()
 
-        self.response.write(self.pdf.output('','S').encode('latin-1'))
+        if self.response.streaming:
+            # fpdf can only serialize the whole document at once, but encoding it a
+            # chunk at a time avoids holding a second full copy while it is sent.
+            self.pdf.close()
+            self.response['Content-Length'] = len(self.pdf.buffer)
+            self.response.streaming_content = self._chunks(self.pdf.buffer)
+        else:
+            self.response.write(self.pdf.output('','S').encode('latin-1'))
         return self.response
+
+    @staticmethod
+    def _chunks(document):
+        for start in range(0, len(document), stream_chunk_size):
+            yield document[start:start + stream_chunk_size].encode('latin-1')
+
+
+class HtmlReport():
+    """
+    HTML rendering of the PdfReport pages, from the same layout, for previewing a
+    report while it is edited. The PDF stays the document that is downloaded and sent.
+    """
+
+    def __init__(self, flight_reports, ticket_body, entitlements=None):
+        if hasattr(flight_reports, 'select_related'):
+            flight_reports = flight_reports.select_related(*header_related)
+        self.flight_reports = flight_reports
+        self.ticket_body = ticket_body
+        self.entitlements = entitlements if entitlements is not None else Entitlements()
+
+    def _current_subscription(self, aircraft):
+        return self.entitlements.current_subscription(aircraft)
+
+    def _load_subscriptions(self):
+        self.entitlements.load(aircraft_ids=[r.flight.aircraft_id for r in self.flight_reports])
+
+    @staticmethod
+    def _traffic(value, gami=False):
+        color, text = report_layout.traffic_light(value, gami)
+        return {'color': 'rgb(%d, %d, %d)' % color if color is not None else None, 'text': text}
+
+    def _box(self, section, flight_report):
+        return {
+            'title': section.title,
+            'traffic': self._traffic(report_layout.summary(section, flight_report)),
+            'lines': report_layout.data_lines(section, flight_report),
+        }
+
+    def _page(self, flight_report):
+        gami = report_layout.GAMI_SECTION
+        return {
+            'header': report_layout.header_columns(flight_report,
+                                                   self._current_subscription(flight_report.flight.aircraft)),
+            'client_comments': report_layout.client_comments(flight_report, self.ticket_body),
+            'findings': flight_report.findings,
+            'gami_title': gami.title,
+            'gami_traffic': self._traffic(report_layout.summary(gami, flight_report), gami=True),
+            'gami_boxes': [(label, getattr(flight_report, name)) for name, label in gami.fields],
+            'data_box_rows': [(self._box(left, flight_report), self._box(right, flight_report))
+                              for left, right in report_layout.DATA_BOX_ROWS],
+            'recommendations': flight_report.recommendations,
+            'additional': flight_report.additional,
+        }
+
+    def generate(self):
+        self._load_subscriptions()
+        pages = [self._page(flight_report) for flight_report in self.flight_reports if flight_report.not_empty()]
+        context = {'pages': pages, 'current_year': timezone.now().year}
+        return HttpResponse(render_to_string('analyst/report-preview.html', context))
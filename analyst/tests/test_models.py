@@ -13,3 +13,29 @@ class TestFlightReport(TestCase):
         self.flight_report.findings = 'test findings'
         self.flight_report.save()
         self.assertTrue(self.flight_report.not_empty())
+
+    def test_flight_report_has_content(self):
+        self.assertFalse(self.flight_report.has_content)
+        self.flight_report.ignition_summary = 'Caution'
+        self.flight_report.save(update_fields=['ignition_summary'])
+        self.flight_report.refresh_from_db()
+        self.assertTrue(self.flight_report.has_content)
+        self.assertEqual(list(FlightReport.objects.with_content()), [self.flight_report])
+
+    def test_flight_report_annotate_content(self):
+        mommy.make(FlightReport, findings='test findings')
+        FlightReport.objects.filter(id=self.flight_report.id).update(gami_summary='0')
+        reports = FlightReport.objects.annotate_content().order_by('id')
+        self.assertEqual([report.content for report in reports], [False, True])
+
+    def test_flight_report_listing_defers_text_fields(self):
+        report = FlightReport.objects.listing().get(id=self.flight_report.id)
+        self.assertIn('findings', report.get_deferred_fields())
+        self.assertNotIn('ignition_summary', report.get_deferred_fields())
+
+    def test_flight_report_search(self):
+        self.flight_report.recommendations = 'Check the split mag timing'
+        self.flight_report.save()
+        match = mommy.make(FlightReport, findings='Split mag timing observed', ignition4='Split mag timing')
+        mommy.make(FlightReport, findings='Marginal plugs')
+        self.assertEqual(list(FlightReport.objects.search('split mag timing')), [match, self.flight_report])
@@ -0,0 +1,33 @@
+from django.test import TestCase
+from model_mommy import mommy
+
+from analyst import report_layout
+from analyst.models import FlightReport
+
+
+class TestReportLayout(TestCase):
+    def test_data_box_rows(self):
+        titles = [(left.title, right.title) for left, right in report_layout.DATA_BOX_ROWS]
+        self.assertEqual(titles, [('Ignition', 'Max Power'),
+                                  ('Temperatures', 'Engine Monitor'),
+                                  ('Powerplant Mgt', 'Electrical')])
+
+    def test_data_lines(self):
+        flight_report = mommy.make(FlightReport, ignition1='#3 bottom', ignition_summary='Caution')
+        section = report_layout.DATA_BOX_ROWS[0][0]
+        lines = report_layout.data_lines(section, flight_report)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0], [FlightReport._meta.get_field('ignition1').verbose_name + ": ", '#3 bottom'])
+        self.assertEqual(report_layout.summary(section, flight_report), 'Caution')
+
+    def test_gami_section(self):
+        self.assertEqual(report_layout.GAMI_SECTION.title, 'GAMI Lean Test')
+        self.assertEqual([label for name, label in report_layout.GAMI_SECTION.fields],
+                         ['Sweep #1', 'Sweep #2', 'Sweep #3', 'Observations'])
+
+    def test_traffic_light(self):
+        self.assertEqual(report_layout.traffic_light('Caution'), ((255, 230, 48), 'Caution'))
+        self.assertEqual(report_layout.traffic_light('N/A'), ((230, 230, 230), 'Not Applicable'))
+        self.assertEqual(report_layout.traffic_light('0', gami=True),
+                         ((230, 230, 230), 'N/A (no usable mixture sweeps observed)'))
+        self.assertEqual(report_layout.traffic_light(''), (None, ''))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from model_mommy import mommy
+from mock import MagicMock, patch
+
+from account.models import Subscription, User
+from aircraft.models import (Aircraft, AircraftManufacturer, AircraftModel, EngineManufacturer, EngineModel,
+                             EngineMonitorManufacturer, EngineMonitorModel)
+from analyst.models import FlightReport
+from analyst.reports import PdfReport, content_disposition, header_related
+from flights.models import Flight
+
+
+class TestPdfReportHeader(TestCase):
+    def setUp(self):
+        user = mommy.make(User, email='test@example.com', first_name='John', last_name='Doe')
+        aircraft = mommy.make(Aircraft, user=user, registration_no='N123',
+                              aircraft_manufacturer=mommy.make(AircraftManufacturer),
+                              aircraft_model=mommy.make(AircraftModel, twin=True),
+                              engine_manufacturer=mommy.make(EngineManufacturer),
+                              engine_model=mommy.make(EngineModel),
+                              engine_monitor_manufacturer=mommy.make(EngineMonitorManufacturer),
+                              engine_monitor_model=mommy.make(EngineMonitorModel))
+        mommy.make(Subscription, aircraft=aircraft, start_date=timezone.now() - timedelta(days=10),
+                   end_date=timezone.now() + timedelta(days=100))
+        self.flight = mommy.make(Flight, aircraft=aircraft, date=timezone.now())
+        mommy.make(FlightReport, flight=self.flight, engine=1)
+        mommy.make(FlightReport, flight=self.flight, engine=2)
+
+    def make_report(self):
+        report = PdfReport(FlightReport.objects.filter(flight=self.flight), None)
+        report.pdf = MagicMock()
+        report.pdf.get_string_width.return_value = 1.0
+        report._font_size_to_fit = lambda text, minimum, maximum, width: minimum
+        report._crop_text_to_fit = lambda text, font_size, line_width, line_count: text
+        return report
+
+    def test_header_queries_for_twin(self):
+        report = self.make_report()
+        # The reports with their header relations, and the subscription once per aircraft
+        with self.assertNumQueries(2):
+            for flight_report in report.flight_reports:
+                report._header(2.6, flight_report)
+
+    def test_content_disposition_from_loaded_report(self):
+        flight_report = FlightReport.objects.select_related(*header_related).filter(flight=self.flight).first()
+        with self.assertNumQueries(0):
+            disposition = content_disposition(flight_report)
+        self.assertTrue(disposition.startswith(b'attachment; filename="'))
+        self.assertTrue(disposition.endswith(b' John Doe N123.pdf"'))
+
+
+class TestPdfReportStream(TestCase):
+    @patch('analyst.reports.stream_chunk_size', 1000)
+    def test_generate_streamed(self):
+        report = PdfReport(FlightReport.objects.none(), None, stream=True)
+        response = report.generate('0')
+        chunks = list(response.streaming_content)
+
+        self.assertTrue(response.streaming)
+        self.assertTrue(all(len(chunk) == 1000 for chunk in chunks[:-1]))
+        self.assertEqual(b''.join(chunks), report.pdf.buffer.encode('latin-1'))
+        self.assertEqual(int(response['Content-Length']), len(b''.join(chunks)))
+        self.assertTrue(chunks[0].startswith(b'%PDF'))
+
+    @patch('analyst.reports.stream_chunk_size', 2)
+    def test_chunks_are_latin1(self):
+        self.assertEqual(list(PdfReport._chunks('%\xe9\xff')), [b'%\xe9', b'\xff'])
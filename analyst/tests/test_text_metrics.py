@@ -0,0 +1,124 @@
+import random
+
+from django.test import TestCase
+
+from analyst.text_metrics import FontMetrics
+
+# 1 cm in points, the scale factor of an FPDF('P', 'cm', ...) document
+K = 72 / 2.54
+
+
+def make_font(widths, missing_width=600):
+    char_widths = [0] * 256
+    for char, width in widths.items():
+        char_widths[ord(char)] = width
+    return {'type': 'TTF', 'cw': char_widths, 'desc': {'MissingWidth': missing_width}}
+
+
+class TestFontMetrics(TestCase):
+    def setUp(self):
+        self.metrics = FontMetrics(make_font({'a': 500, 'b': 1000, ' ': 250}))
+
+    def test_string_units(self):
+        self.assertEqual(self.metrics.string_units('ab a'), 2250)
+
+    def test_string_units_missing_glyph(self):
+        self.assertEqual(self.metrics.string_units('aЀ'), 1100)
+
+    def test_string_width(self):
+        self.assertEqual(self.metrics.string_width('bb', 12, K), 2000 * (12 / K) / 1000.0)
+
+    def test_font_size_to_fit_maximum(self):
+        self.assertEqual(self.metrics.font_size_to_fit('ab', 8, 12, 10, K), 12)
+
+    def test_font_size_to_fit_shrinks(self):
+        width = self.metrics.string_width('bbbb', 10, K)
+        self.assertEqual(self.metrics.font_size_to_fit('bbbb', 8, 12, width, K), 10)
+
+    def test_font_size_to_fit_minimum(self):
+        self.assertEqual(self.metrics.font_size_to_fit('bbbb', 8, 12, 0.1, K), 8)
+
+    def test_font_size_to_fit_empty_text(self):
+        self.assertEqual(self.metrics.font_size_to_fit('', 8, 12, 0, K), 12)
+        self.assertEqual(self.metrics.font_size_to_fit('', 8, 12, -1, K), 11)
+
+
+def legacy_crop_text_to_fit(get_string_width, text, line_width, line_count):
+    # PdfReport._crop_text_to_fit as it was before the metrics cache, measuring
+    # through get_string_width the way fpdf does.
+    resulting_lines = [""]
+    remaining_lines = line_count
+    remaining_line_space = line_width
+    words = text.split(' ')
+    current_word = 0
+
+    while remaining_lines > 0 and current_word < len(words):
+        word_width = get_string_width(words[current_word] + " ")
+        if word_width <= remaining_line_space - 0.2:
+            remaining_line_space -= word_width
+            resulting_lines[-1] += words[current_word] + " "
+            current_word += 1
+        else:
+            resulting_lines[-1] = resulting_lines[-1].strip()
+            resulting_lines.append("")
+            remaining_lines -= 1
+            remaining_line_space = line_width
+
+    if resulting_lines[-1] == "":
+        resulting_lines = resulting_lines[0:-1]
+
+    if remaining_lines == 0 and current_word < len(words):
+        resulting_lines[-1] += " " + words[current_word]
+        while True:
+            if get_string_width(resulting_lines[-1]) + 0.2 < line_width:
+                break
+            if resulting_lines[-1] == "...":
+                break
+            elif resulting_lines[-1].endswith('...'):
+                resulting_lines[-1] = resulting_lines[-1][0:-4]
+            else:
+                resulting_lines[-1] = resulting_lines[-1][0:-1]
+            resulting_lines[-1] += "..."
+
+    return_text = "\n".join(resulting_lines)
+    return return_text.strip()
+
+
+class TestCropTextToFit(TestCase):
+    WORDS = ['split', 'mag', 'timing', 'CHT', 'EGT#3', '...', 'x...', '', 'é', '1.5',
+             'anexceptionallylongwordthatcannotfitonanyline']
+
+    def setUp(self):
+        widths = {char: 400 + (ord(char) * 37) % 500 for char in map(chr, range(32, 256))}
+        widths['.'] = 278
+        self.metrics = FontMetrics(make_font(widths))
+
+    def crop(self, text, font_size, line_width, line_count):
+        return self.metrics.crop_text_to_fit(text, font_size, line_width, line_count, K)
+
+    def legacy_crop(self, text, font_size, line_width, line_count):
+        def get_string_width(s):
+            return self.metrics.string_width(s, font_size, K)
+        return legacy_crop_text_to_fit(get_string_width, text, line_width, line_count)
+
+    def test_text_that_fits(self):
+        self.assertEqual(self.crop('split mag timing', 10, 19.59, 1), 'split mag timing')
+
+    def test_wraps_lines(self):
+        self.assertEqual(self.crop('split mag timing', 10, 2, 3), 'split\nmag\ntiming')
+
+    def test_crops_with_ellipsis(self):
+        result = self.crop('split mag timing on the left engine', 10, 3, 1)
+        self.assertTrue(result.endswith('...'))
+        self.assertLess(self.metrics.string_width(result, 10, K) + 0.2, 3)
+
+    def test_matches_legacy_implementation(self):
+        rnd = random.Random(1234)
+        for _ in range(3000):
+            text = ' '.join(rnd.choice(self.WORDS) for _ in range(rnd.randint(0, 60)))
+            font_size = rnd.choice([8, 9, 10, 12])
+            line_width = rnd.choice([19.59, 9.295, 4.1475, rnd.uniform(0, 10)])
+            line_count = rnd.choice([1, 2, 5, 9])
+            self.assertEqual(self.crop(text, font_size, line_width, line_count),
+                             self.legacy_crop(text, font_size, line_width, line_count),
+                             (text, font_size, line_width, line_count))
@@ -0,0 +1,203 @@
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from model_mommy import mommy
+from mock import patch
+
+from account.models import User
+from aircraft.models import Aircraft
+from analyst.models import FlightReport, FlightReportPdf
+from analyst.reports import PdfReport
+from analyst.utils import (cached_report_pdf,
+                           export_queryset,
+                           search_aircraft,
+                           search_engine_data_files,
+                           export_reports_pdf,
+                           report_content_hash,
+                           report_pdf_cache_stats,
+                           report_pdf_response)
+from files.models import EngineDataFile
+from flights.models import Flight
+from tickets.models import TicketRequest
+
+
+class TestReportPdfCache(TestCase):
+    def setUp(self):
+        user = mommy.make(User, email='test@example.com', first_name='John', last_name='Doe')
+        aircraft = mommy.make(Aircraft, user=user, registration_no='N123')
+        flight = mommy.make(Flight, aircraft=aircraft)
+        self.report = mommy.make(FlightReport, flight=flight, engine=0, findings='Split mag timing',
+                                 last_update_on=timezone.now())
+
+    def test_report_content_hash_is_stable(self):
+        self.assertEqual(report_content_hash([self.report], 'body'), report_content_hash([self.report], 'body'))
+
+    def test_report_content_hash_changes_with_report(self):
+        content_hash = report_content_hash([self.report], 'body')
+        self.report.findings = 'Marginal plugs'
+        self.assertNotEqual(content_hash, report_content_hash([self.report], 'body'))
+
+    def test_report_content_hash_ignores_saves(self):
+        content_hash = report_content_hash([self.report], 'body')
+        self.report.last_update_on = timezone.now() + timedelta(hours=1)
+        self.report.save()
+        self.assertEqual(content_hash, report_content_hash([self.report], 'body'))
+
+    def test_report_content_hash_changes_with_header(self):
+        content_hash = report_content_hash([self.report], 'body')
+        self.report.flight.aircraft.registration_no = 'N456'
+        self.assertNotEqual(content_hash, report_content_hash([self.report], 'body'))
+
+    def test_report_content_hash_changes_with_ticket_body(self):
+        self.assertNotEqual(report_content_hash([self.report], 'body'), report_content_hash([self.report], None))
+
+    @patch('analyst.reports.PdfReport.generate')
+    def test_cached_report_pdf(self, mock_generate):
+        mock_generate.return_value.content = b'%PDF'
+        self.assertEqual(cached_report_pdf([self.report], None), b'%PDF')
+        self.assertEqual(cached_report_pdf([self.report], None), b'%PDF')
+        self.assertEqual(mock_generate.call_count, 1)
+        stats = report_pdf_cache_stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['size'], 4)
+
+    @override_settings(REPORT_PDF_CACHE_MAX_SIZE=10)
+    @patch('analyst.reports.PdfReport.generate')
+    def test_cached_report_pdf_evicts_least_recently_used(self, mock_generate):
+        old = FlightReportPdf(content_hash='old', size=8, last_accessed_on=timezone.now() - timedelta(days=1))
+        old.pdf.save('old.pdf', ContentFile(b'x' * 8))
+        mock_generate.return_value.content = b'%PDF'
+        cached_report_pdf([self.report], None)
+        self.assertFalse(FlightReportPdf.objects.filter(content_hash='old').exists())
+        self.assertEqual(FlightReportPdf.objects.count(), 1)
+
+    @override_settings(REPORT_PDF_CACHE_MAX_SIZE=2)
+    @patch('analyst.reports.PdfReport.generate')
+    def test_cached_report_pdf_keeps_entry_over_budget(self, mock_generate):
+        mock_generate.return_value.content = b'%PDF'
+        cached_report_pdf([self.report], None)
+        self.assertEqual(FlightReportPdf.objects.count(), 1)
+
+    @patch('analyst.reports.PdfReport.generate')
+    def test_report_pdf_response(self, mock_generate):
+        mock_generate.return_value.content = b'%PDF'
+        result = report_pdf_response(FlightReport.objects.filter(id=self.report.id), None, '0')
+        self.assertEqual(result.content, b'%PDF')
+
+        result = report_pdf_response(FlightReport.objects.filter(id=self.report.id), None, '0')
+        self.assertEqual(b''.join(result.streaming_content), b'%PDF')
+        self.assertEqual(mock_generate.call_count, 1)
+
+
+class TestReportExport(TestCase):
+    def setUp(self):
+        self.flight = mommy.make(Flight)
+        self.left = mommy.make(FlightReport, flight=self.flight, engine=1, findings='Split mag timing',
+                               created_on=timezone.now() - timedelta(days=10))
+        self.right = mommy.make(FlightReport, flight=self.flight, engine=2, created_on=timezone.now())
+        self.empty = mommy.make(FlightReport, engine=0, created_on=timezone.now())
+
+    def test_export_queryset_by_ids(self):
+        self.assertEqual(list(export_queryset(report_ids=[self.right.id, self.left.id])), [self.left, self.right])
+
+    def test_export_queryset_by_created_on(self):
+        flight_reports = export_queryset(created_from=timezone.now() - timedelta(days=1))
+        self.assertEqual(set(flight_reports), {self.right, self.empty})
+
+    @patch('analyst.reports.PdfReport.generate')
+    def test_export_reports_pdf_skips_empty_reports(self, mock_generate):
+        mock_generate.return_value.content = b'%PDF'
+        output = BytesIO()
+        self.assertEqual(export_reports_pdf(export_queryset(report_ids=[self.left.id, self.right.id, self.empty.id]), output), 1)
+        self.assertEqual(output.getvalue(), b'%PDF')
+
+    @patch('analyst.utils.get_ticket_body', return_value='Rough running at cruise')
+    @patch('analyst.reports.PdfReport.generate')
+    def test_export_reports_pdf_client_comments_from_ticket(self, mock_generate, mock_body):
+        mock_generate.return_value.content = b'%PDF'
+        ticket = mommy.make(TicketRequest)
+        self.left.ticket = ticket
+        self.left.save()
+        with patch('analyst.utils.PdfReport', wraps=PdfReport) as mock_report:
+            export_reports_pdf(export_queryset(report_ids=[self.left.id]), BytesIO())
+        self.assertEqual(mock_report.call_args[1]['ticket_bodies'], {ticket.id: 'Rough running at cruise'})
+        mock_body.assert_called_once_with(ticket.id)
+
+
+class TestSearchEngineDataFiles(TestCase):
+    def setUp(self):
+        self.edfs = [mommy.make(EngineDataFile, name='Flight{}.csv'.format(x), processed=True) for x in range(5)]
+        mommy.make(EngineDataFile, name='other.jpi', processed=True)
+
+    @patch('analyst.utils.FILE_SEARCH_PAGE_SIZE', 2)
+    def test_search_engine_data_files_pages(self):
+        edfs, next_after, count = search_engine_data_files('flight')
+        self.assertEqual(list(edfs), [self.edfs[4], self.edfs[3]])
+        self.assertEqual(count, 5)
+
+        edfs, next_after, count = search_engine_data_files('flight', next_after)
+        self.assertEqual(list(edfs), [self.edfs[2], self.edfs[1]])
+
+        edfs, next_after, count = search_engine_data_files('flight', next_after)
+        self.assertEqual(list(edfs), [self.edfs[0]])
+        self.assertIsNone(next_after)
+
+    @patch('analyst.utils.FILE_SEARCH_COUNT_LIMIT', 3)
+    def test_search_engine_data_files_count_limit(self):
+        _, _, count = search_engine_data_files('FLIGHT')
+        self.assertEqual(count, 4)
+
+    @patch('analyst.utils.FILE_SEARCH_COUNT_LIMIT', 5)
+    def test_search_engine_data_files_count_at_limit(self):
+        _, _, count = search_engine_data_files('FLIGHT')
+        self.assertEqual(count, 5)
+
+
+class TestSearchAircraft(TestCase):
+    def setUp(self):
+        user = mommy.make(User, email='owner@example.com', first_name='John', last_name='Doe')
+        self.aircraft = [mommy.make(Aircraft, user=user, registration_no='N1{}'.format(x)) for x in range(3)]
+        mommy.make(Aircraft, user=user, registration_no='C-GABC')
+        mommy.make(Aircraft, registration_no='N100')
+        mommy.make(Flight, aircraft=self.aircraft[0], _quantity=2)
+
+    @patch('analyst.utils.AIRCRAFT_SEARCH_PAGE_SIZE', 2)
+    def test_search_aircraft_pages(self):
+        aircraft, next_after = search_aircraft('n1')
+        self.assertEqual(aircraft, self.aircraft[:2])
+
+        aircraft, next_after = search_aircraft('n1', next_after)
+        self.assertEqual(aircraft, self.aircraft[2:])
+        self.assertIsNone(next_after)
+
+    @patch('analyst.utils.AIRCRAFT_SEARCH_PAGE_SIZE', 4)
+    def test_search_aircraft_pages_without_tail_numbers(self):
+        untailed = [mommy.make(Aircraft, user=self.aircraft[0].user, registration_no=None) for _ in range(2)]
+        aircraft, next_after = search_aircraft('john')
+        self.assertEqual(aircraft[1:], self.aircraft)
+        aircraft, next_after = search_aircraft('john', next_after)
+        self.assertEqual(aircraft, untailed)
+        self.assertIsNone(next_after)
+
+    @patch('analyst.utils.AIRCRAFT_SEARCH_PAGE_SIZE', 2)
+    def test_search_aircraft_page_boundary(self):
+        _, next_after = search_aircraft('n1')
+        self.assertEqual(next_after, '{}:N11'.format(self.aircraft[1].id))
+
+        # The next page starts after the last aircraft shown, even once it is deleted
+        mommy.make(Aircraft, user=self.aircraft[0].user, registration_no='N105')
+        self.aircraft[1].delete()
+        aircraft, next_after = search_aircraft('n1', next_after)
+        self.assertEqual(aircraft, self.aircraft[2:])
+        self.assertIsNone(next_after)
+
+        with self.assertRaises(ValueError):
+            search_aircraft('n1', 'N11')
+
+    def test_search_aircraft_flight_counts(self):
+        with self.assertNumQueries(1):
+            aircraft, _ = search_aircraft('doe')
+        self.assertEqual([a.flight_total for a in aircraft], [0, 2, 0, 0])
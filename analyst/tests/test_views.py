@@ -10,7 +10,7 @@ from model_mommy import mommy
 from mock import patch
 
 from analyst.views import get_matching_report
-from analyst.models import FlightReport, FlightReportClipboadEntry
+from analyst.models import FlightReport, FlightReportClipboadEntry, FlightReportPdf
 from files.models import EngineDataFile
 from flights.models import Flight
 from aircraft.models import (AircraftModel, Aircraft, AircraftManufacturer, EngineMonitorModel,
@@ -79,6 +79,46 @@ class TestAnalystFileSearchView(TestCase):
         self.assertEqual(result.context['edfs'].count(), 3)
 
 
+class TestFlightReportTextSearchView(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestFlightReportTextSearchView, cls).setUpClass()
+        mommy.make(Group, name="Analyst")
+        cls.content_type = mommy.make('ContentType', app_label='global_permission')
+        cls.content_type.model = 'global_permission'
+        cls.content_type.save()
+        cls.user = User.objects.create_user(EMAIL, PASSWORD)
+        cls.perm = mommy.make('Permission', codename='view_user_data', content_type=cls.content_type)
+
+    def setUp(self):
+        self.user.user_permissions.add(self.perm)
+        self.user.save()
+        self.client.login(username=EMAIL, password=PASSWORD)
+        self.url = reverse('flight_report_text_search')
+
+    def test_flight_report_text_search_view_permission_error(self):
+        self.user.user_permissions.remove(self.perm)
+        self.user.save()
+        result = self.client.get(self.url)
+        self.assertRedirects(result, PERMISSION_URL + NEXT + self.url)
+
+    def test_flight_report_text_search_view(self):
+        report = mommy.make(FlightReport, engine=0, findings='Split mag timing on the left magneto')
+        mommy.make(FlightReport, engine=0, findings='Marginal plugs')
+        result = self.client.get(self.url, data={'q': 'split timing'})
+        results = result.json()['results']
+        self.assertEqual([r['id'] for r in results], [report.id])
+        self.assertIn('<b>Split</b>', results[0]['snippet'])
+
+    def test_flight_report_text_search_view_escapes_snippets(self):
+        mommy.make(FlightReport, engine=0, findings='Split <script>mag</script> timing')
+        result = self.client.get(self.url, data={'q': 'split'})
+        snippet = result.json()['results'][0]['snippet']
+        self.assertIn('<b>Split</b>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertNotIn('<script>', snippet)
+
+
 class TestDownloadEdfView(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -246,6 +286,16 @@ class TestAnalystAircraftSearch(TestCase):
         self.assertTemplateUsed(result, 'analyst/_aircraft-list.html')
         self.assertEqual(len(result.context['aircraft']), 0)
 
+    @patch('analyst.views.get_all_mx_aircraft_and_owners', return_value=[])
+    def test_analyst_aircraft_search_post_invalid_page(self, *args, **kwargs):
+        ajax_header = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        data = {
+            'search_term': 'john',
+            'after': 'N123',
+        }
+        result = self.client.post(reverse('analyst_aircraft_search'), data=data, **ajax_header)
+        self.assertEqual(result.status_code, 400)
+
     @patch('analyst.views.get_all_mx_aircraft_and_owners', return_value=[])
     def test_analyst_aircraft_search_post_without_data(self, *args, **kwargs):
         ajax_header = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
@@ -646,6 +696,48 @@ class TestPreviewReport(TestCase):
                          result.context['pdf_preview'])
 
 
+class TestPreviewReportHtml(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestPreviewReportHtml, cls).setUpClass()
+        cls.analyst = mommy.make(Group, name="Analyst")
+        cls.content_type = mommy.make('ContentType', app_label='global_permission')
+        cls.content_type.model = 'global_permission'
+        cls.content_type.save()
+        cls.user = User.objects.create_user(EMAIL, PASSWORD)
+        cls.perm = mommy.make('Permission', codename='view_sa_reports', content_type=cls.content_type)
+
+    def setUp(self):
+        self.user.user_permissions.add(self.perm)
+        self.user.save()
+        self.client.login(username=EMAIL, password=PASSWORD)
+        self.flight = mommy.make(Flight, date=NOW)
+        self.ticket = mommy.make(TicketRequest)
+        self.report = mommy.make(FlightReport, flight=self.flight, ticket=self.ticket, engine=0,
+                                 findings='Split mag timing', ignition_summary='Caution')
+        self.url = reverse('preview_report_html', args=[self.ticket.id, self.flight.id])
+
+    def test_preview_report_html_not_logged_in(self):
+        self.client.logout()
+        result = self.client.get(self.url)
+        self.assertRedirects(result, reverse('auth_login') + '?next=' + self.url)
+
+    def test_preview_report_html_permission_denied(self):
+        self.user.user_permissions.remove(self.perm)
+        result = self.client.get(self.url)
+        self.assertRedirects(result, reverse('permissions-error') + '?next=' + self.url)
+
+    @patch('analyst.views.get_ticket_body')
+    def test_preview_report_html(self, mock_body):
+        mock_body.return_value = 'Rough running at cruise'
+        result = self.client.get(self.url)
+        self.assertTemplateUsed(result, 'analyst/report-preview.html')
+        self.assertContains(result, 'Split mag timing')
+        self.assertContains(result, 'rgb(255, 230, 48)')
+        self.assertContains(result, 'Rough running at cruise')
+        mock_body.assert_called_once_with(self.ticket.id)
+
+
 class TestDownloadReportView(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -695,6 +787,31 @@ class TestDownloadReportView(TestCase):
         self.assertEqual(result._headers['content-type'], ('Content-Type', 'application/pdf'))
 
 
+    @patch('analyst.views.get_ticket_body', return_value='Rough running at cruise')
+    @patch('analyst.reports.PdfReport.generate')
+    def test_download_report_view_renders_once(self, mock_generate, mock_body):
+        mock_generate.return_value.content = b'%PDF'
+        ticket = mommy.make(TicketRequest, user=self.user)
+        self.report.ticket = ticket
+        self.report.findings = 'Split mag timing'
+        self.report.save()
+        url = reverse('download_report', args=[ticket.id, self.flight.id, 1])
+
+        # A miss renders the PDF in the request and stores it
+        result = self.client.get(url)
+        self.assertEqual(result.content, b'%PDF')
+        self.assertTrue(result['Content-Disposition'].startswith('attachment;'))
+        self.assertEqual(FlightReportPdf.objects.count(), 1)
+
+        # A hit serves the stored PDF
+        result = self.client.get(url)
+        self.assertEqual(b''.join(result.streaming_content), b'%PDF')
+        self.assertEqual(result._headers['content-type'], ('Content-Type', 'application/pdf'))
+        self.assertTrue(result['Content-Disposition'].startswith('attachment;'))
+        self.assertEqual(mock_generate.call_count, 1)
+        mock_body.assert_called_with(ticket.id)
+
+
 class TestDeleteReportView(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,144 @@
+# Core
+from functools import lru_cache
+from itertools import accumulate
+
+
+# Glyph metrics are read from the fpdf font tables the first time a font is
+# measured and shared by every PdfReport rendered in this process afterwards.
+_font_metrics = {}
+
+
+class FontMetrics():
+    """
+    Glyph widths (in 1/1000 em units) for one fpdf font, keyed by codepoint.
+
+    Widths are computed exactly the way fpdf's get_string_width does, so a string
+    can be measured once and its width at any font size derived from that.
+    """
+
+    def __init__(self, font):
+        self.char_widths = font['cw']
+        self.unicode = font['type'] == 'TTF'
+        self.missing_width = font.get('desc', {}).get('MissingWidth') or 500
+        self.string_units = lru_cache(maxsize=4096)(self._string_units)
+
+    def glyph_units(self, char):
+        if not self.unicode:
+            return self.char_widths.get(char, 0)
+
+        codepoint = ord(char)
+        if len(self.char_widths) > codepoint:
+            return self.char_widths[codepoint]
+        return self.missing_width
+
+    def _string_units(self, text):
+        units = 0
+        for char in text:
+            units += self.glyph_units(char)
+        return units
+
+    def string_width(self, text, font_size, k):
+        # Same operation order as fpdf (font_size / k is fpdf's internal size) so
+        # the results are bit for bit identical to get_string_width.
+        return self.string_units(text) * (font_size / k) / 1000.0
+
+    def font_size_to_fit(self, text, minimum, maximum, width, k):
+        """
+        Largest of maximum, maximum - 1, ... down to minimum at which text fits width.
+
+        Returns minimum when nothing fits. Width grows linearly with the font size,
+        so the candidate sizes are binary searched rather than walked one by one.
+        """
+        sizes = [maximum]
+        while sizes[-1] > minimum:
+            sizes.append(max(sizes[-1] - 1, minimum))
+
+        units = self.string_units(text)
+
+        def fits(size):
+            return units * (size / k) / 1000.0 <= width
+
+        if text == "":
+            # An empty string only fails to fit a negative width; the old loop then
+            # stepped down a single size before giving up.
+            return sizes[0] if fits(sizes[0]) or len(sizes) == 1 else sizes[1]
+
+        low, high = 0, len(sizes) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if fits(sizes[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        return sizes[low]
+
+    def crop_text_to_fit(self, text, font_size, line_width, line_count, k):
+        """
+        Word wrap text into at most line_count lines of line_width, ending in "..." if cropped.
+
+        Each word is measured once. When the text overflows, the cut point of the
+        last line is binary searched over the prefix sums of its glyph widths
+        instead of trimming and re-measuring it one character at a time.
+        """
+        scale = font_size / k
+
+        resulting_lines = [""]
+        remaining_lines = line_count
+        remaining_line_space = line_width
+        words = text.split(' ')
+        current_word = 0
+
+        # Kept as a running subtraction, like the original loop, so that line
+        # breaks land on exactly the same words.
+        while remaining_lines > 0 and current_word < len(words):
+            word_width = self.string_units(words[current_word] + " ") * scale / 1000.0
+            if word_width <= remaining_line_space - 0.2:
+                remaining_line_space -= word_width
+                resulting_lines[-1] += words[current_word] + " "
+                current_word += 1
+            else:
+                resulting_lines[-1] = resulting_lines[-1].strip()
+                resulting_lines.append("")
+                remaining_lines -= 1
+                remaining_line_space = line_width
+
+        if resulting_lines[-1] == "":
+            resulting_lines = resulting_lines[0:-1]
+
+        if remaining_lines == 0 and current_word < len(words):
+            resulting_lines[-1] = self._ellipsize(resulting_lines[-1] + " " + words[current_word], scale, line_width)
+
+        return_text = "\n".join(resulting_lines)
+        return return_text.strip()
+
+    def _ellipsize(self, line, scale, line_width):
+        def fits(units):
+            return units * scale / 1000.0 + 0.2 < line_width
+
+        if line == "..." or fits(self.string_units(line)):
+            return line
+
+        # Successive candidates are line[:n] + "..." for a shrinking n, starting by
+        # dropping one character (or a previous "..." and the character before it).
+        cumulative_units = [0] + list(accumulate(self.glyph_units(char) for char in line))
+        ellipsis_units = self.string_units("...")
+
+        low = 0
+        high = max(len(line) - (4 if line.endswith("...") else 1), 0)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(cumulative_units[middle] + ellipsis_units):
+                low = middle
+            else:
+                high = middle - 1
+        return line[0:low] + "..."
+
+
+def metrics_for(pdf):
+    """Metrics of the font currently selected on an fpdf.FPDF instance."""
+    key = (pdf.font_family, pdf.font_style)
+    metrics = _font_metrics.get(key)
+    if metrics is None:
+        metrics = FontMetrics(pdf.current_font)
+        _font_metrics[key] = metrics
+    return metrics
@@ -12,6 +12,12 @@ urlpatterns = [
 
     # Analysis Tickets
 
+    url(r'^analyst/aircraft_search/?$',
+        views.analyst_aircraft_search, name='analyst_aircraft_search'),
+
+    url(r'^analyst/report-text-search/?$',
+        views.flight_report_text_search, name='flight_report_text_search'),
+
     url(r'^analyst/generate-report/(?P<ticket_id>\d+)/(?P<flight_id>\d+)/?$',
         views.generate_report, name='generate_report'),
 
@@ -21,5 +27,17 @@ urlpatterns = [
     url(r'^analyst/edit-report/(?P<report_id>\d+)/?$',
         views.edit_report, name='edit_report'),
 
+    url(r'^analyst/preview-report-html/(?P<ticket_id>\d+)/(?P<flight_id>\d+)/?$',
+        views.preview_report_html, name='preview_report_html'),
+
+    url(r'^analyst/preview-report-mx-html/(?P<flight_id>\d+)/?$',
+        views.preview_report_mx_html, name='preview_report_mx_html'),
+
+    url(r'^analyst/download-report/(?P<ticket_id>\d+)/(?P<flight_id>\d+)/(?P<attachment>[01])/?$',
+        views.download_report, name='download_report'),
+
+    url(r'^analyst/download-report-mx/(?P<flight_id>\d+)/(?P<attachment>[01])/?$',
+        views.download_report_mx, name='download_report_mx'),
+
     url(r'^analyst/delete-report/(?P<report_id>\d*)/?$', views.delete_report, name='delete_report'),
 ]
@@ -0,0 +1,355 @@
+# Core
+import hashlib
+import logging
+import zipfile
+from datetime import datetime
+from itertools import groupby
+from multiprocessing import Pool
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connections
+from django.db.models import Count, F, Q, Sum
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+
+# App
+from aircraft.entitlements import Entitlements
+from aircraft.models import Aircraft, AircraftFlightStats
+from analyst import pdf_resources, report_layout
+from analyst.models import FlightReport, FlightReportPdf
+from analyst.reports import PdfReport, content_disposition, header_related
+from files.models import EngineDataFile
+from tickets.utils import get_ticket_body
+
+logger = logging.getLogger(__name__)
+
+# Files per page of a filename search, and how far its match count is counted
+FILE_SEARCH_PAGE_SIZE = 100
+FILE_SEARCH_COUNT_LIMIT = 1000
+
+# Aircraft per page of an analyst aircraft search
+AIRCRAFT_SEARCH_PAGE_SIZE = 100
+
+# What an aircraft search term is matched against, as a prefix
+AIRCRAFT_SEARCH_FIELDS = (
+    'registration_no',
+    'user__first_name',
+    'user__last_name',
+    'user__email',
+    'aircraft_manufacturer__name',
+    'aircraft_model__name',
+    'engine_manufacturer__name',
+    'engine_model__name',
+)
+
+
+def report_pdf_cache_max_size():
+    """Bytes the stored report PDFs may take before the least recently used ones are evicted."""
+    return getattr(settings, 'REPORT_PDF_CACHE_MAX_SIZE', 2 * 1024 ** 3)
+
+
+def _report_fields(report, ticket_body):
+    return [repr(getattr(report, name)) for name in report_layout.PRINTED_FIELDS] + \
+        [report_layout.client_comments(report, ticket_body)]
+
+
+def report_content_hash(flight_reports, ticket_body, entitlements=None):
+    """
+    Hash of everything PdfReport prints for flight_reports.
+
+    That is the FlightReport fields it prints (report_layout.PRINTED_FIELDS), the
+    client comments, the client/aircraft/subscription header and the report date,
+    which is the day the PDF is rendered. Saving a report without changing what
+    it prints keeps its hash. Pass the entitlements the PDF is rendered with to
+    look the subscriptions up once.
+    """
+    content = [datetime.utcnow().date().isoformat(), repr(ticket_body)]
+
+    if entitlements is None:
+        entitlements = Entitlements()
+    entitlements.load(aircraft_ids=[report.flight.aircraft_id for report in flight_reports])
+
+    for report in flight_reports:
+        content += _report_fields(report, ticket_body)
+
+        flight = report.flight
+        aircraft = flight.aircraft
+        subscription = entitlements.current_subscription(aircraft)
+        content += [
+            aircraft.user.first_name,
+            aircraft.user.last_name,
+            str(aircraft.registration_no),
+            str(flight.date),
+            str(aircraft.aircraft_manufacturer),
+            str(aircraft.aircraft_model),
+            str(aircraft.engine_manufacturer),
+            str(aircraft.engine_model),
+            str(aircraft.engine_monitor_manufacturer),
+            str(aircraft.engine_monitor_model),
+            str(subscription.end_date) if subscription is not None else '',
+        ]
+
+    return hashlib.sha1('\x1f'.join(content).encode('utf-8')).hexdigest()
+
+
+def _count(event):
+    key = 'report_pdf_cache:' + event
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+def report_pdf_cache_stats():
+    stats = FlightReportPdf.objects.aggregate(entries=Count('id'), size=Sum('size'))
+    stats['size'] = stats['size'] or 0
+    stats['hits'] = cache.get('report_pdf_cache:hits', 0)
+    stats['misses'] = cache.get('report_pdf_cache:misses', 0)
+    return stats
+
+
+def _cached_entry(content_hash):
+    entry = FlightReportPdf.objects.filter(content_hash=content_hash).first()
+    if entry is None:
+        _count('misses')
+        return None
+
+    _count('hits')
+    FlightReportPdf.objects.filter(id=entry.id).update(last_accessed_on=timezone.now())
+    return entry
+
+
+def _evict_report_pdfs(keep):
+    total_size = FlightReportPdf.objects.aggregate(Sum('size'))['size__sum'] or 0
+    max_size = report_pdf_cache_max_size()
+
+    # keep, the entry just stored, stays even when it alone is over the budget
+    for entry in FlightReportPdf.objects.exclude(id=keep.id).order_by('last_accessed_on').iterator():
+        if total_size <= max_size:
+            break
+        total_size -= entry.size
+        entry.pdf.delete(save=False)
+        entry.delete()
+
+
+def _store_report_pdf(content_hash, content):
+    entry = FlightReportPdf(content_hash=content_hash, size=len(content), last_accessed_on=timezone.now())
+    entry.pdf.save(content_hash + '.pdf', ContentFile(content), save=False)
+    try:
+        entry.save()
+    except IntegrityError:
+        # Stored concurrently by another worker
+        entry.pdf.delete(save=False)
+        return
+    _evict_report_pdfs(entry)
+
+
+def _ordered_reports(report_ids):
+    return FlightReport.objects.filter(id__in=report_ids).select_related(*header_related).order_by('engine', 'id')
+
+
+def _render_report_pdf(flight_reports, ticket_body, entitlements, content_hash):
+    content = PdfReport(flight_reports, ticket_body, entitlements=entitlements).generate('0').content
+    _store_report_pdf(content_hash, content)
+    return content
+
+
+def cached_report_pdf(flight_reports, ticket_body):
+    """PDF bytes for flight_reports, rendered only when this content was not rendered before."""
+    entitlements = Entitlements()
+    content_hash = report_content_hash(flight_reports, ticket_body, entitlements)
+
+    entry = _cached_entry(content_hash)
+    if entry is not None:
+        with entry.pdf.open('rb') as pdf:
+            return pdf.read()
+    return _render_report_pdf(flight_reports, ticket_body, entitlements, content_hash)
+
+
+def report_pdf_response(flight_reports, ticket_body, attachment, entitlements=None):
+    """
+    Response with the PDF of flight_reports, a FlightReport queryset, served from
+    storage when this content was rendered before. Otherwise it is rendered here
+    and stored, so the next download or preview of the same content is a read.
+    """
+    flight_reports = list(flight_reports.select_related(*header_related).order_by('engine', 'id'))
+    if entitlements is None:
+        entitlements = Entitlements()
+    content_hash = report_content_hash(flight_reports, ticket_body, entitlements)
+
+    entry = _cached_entry(content_hash)
+    if entry is not None:
+        response = FileResponse(entry.pdf.open('rb'), content_type='application/pdf')
+    else:
+        response = HttpResponse(_render_report_pdf(flight_reports, ticket_body, entitlements, content_hash),
+                                content_type='application/pdf')
+
+    if attachment == '1' and flight_reports:
+        # Named from the header data loaded with the reports, without querying again
+        response['Content-Disposition'] = content_disposition(flight_reports[0])
+    return response
+
+
+def export_queryset(report_ids=None, ticket_ids=None, created_from=None, created_to=None):
+    """FlightReports selected by id, by ticket and/or by a created_on range, in export order."""
+    flight_reports = FlightReport.objects.all()
+    if report_ids:
+        flight_reports = flight_reports.filter(id__in=report_ids)
+    if ticket_ids:
+        flight_reports = flight_reports.filter(ticket_id__in=ticket_ids)
+    if created_from is not None:
+        flight_reports = flight_reports.filter(created_on__gte=created_from)
+    if created_to is not None:
+        flight_reports = flight_reports.filter(created_on__lt=created_to)
+    return flight_reports.order_by('ticket_id', 'flight_id', 'engine', 'id')
+
+
+def _export_groups(flight_reports):
+    # One PDF per ticket and flight, so both engines of a twin share a document.
+    # Content is computed from the fields, as exports also cover reports that were
+    # bulk updated since they were last saved.
+    groups = []
+    rows = flight_reports.annotate_content().values_list('ticket_id', 'flight_id', 'id', 'content')
+    for _, reports in groupby(rows, key=lambda row: row[:2]):
+        reports = list(reports)
+        if any(has_content for _, _, _, has_content in reports):
+            groups.append([report_id for _, _, report_id, _ in reports])
+    return groups
+
+
+def _init_export_worker():
+    pdf_resources.warm_up()
+
+
+def _render_export_group(report_ids):
+    flight_reports = _ordered_reports(report_ids)
+    first = flight_reports[0]
+    file_name = '{}-{}-{}.pdf'.format(first.ticket_id or 'no-ticket', first.flight_id,
+                                      first.flight.aircraft.registration_no)
+    # The client comments of the PDF sent for the ticket come from it
+    ticket_body = get_ticket_body(first.ticket_id) if first.ticket_id is not None else None
+    return file_name, PdfReport(flight_reports, ticket_body).generate('0').content
+
+
+def export_reports_zip(flight_reports, output, processes=None):
+    """
+    Render flight_reports into a zip file (a path or file object), one PDF per
+    ticket and flight, across a pool of processes. Returns the number of PDFs.
+    """
+    groups = _export_groups(flight_reports)
+
+    # Workers are forked and must not inherit the open database connection
+    connections.close_all()
+    with Pool(processes, initializer=_init_export_worker) as pool, \
+            zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for file_name, content in pool.imap_unordered(_render_export_group, groups):
+            archive.writestr(file_name, content)
+    return len(groups)
+
+
+def export_reports_pdf(flight_reports, output):
+    """
+    Render flight_reports into a single PDF written to output, a binary file object.
+    Returns the number of reports in it, those with content.
+    """
+    flight_reports = list(flight_reports.annotate_content().filter(content=True).select_related(*header_related))
+    if not flight_reports:
+        return 0
+
+    # The client comments of the PDFs sent for the tickets come from them
+    ticket_ids = {report.ticket_id for report in flight_reports} - {None}
+    ticket_bodies = {ticket_id: get_ticket_body(ticket_id) for ticket_id in ticket_ids}
+    output.write(PdfReport(flight_reports, None, ticket_bodies=ticket_bodies).generate('0').content)
+    return len(flight_reports)
+
+
+def search_engine_data_files(q, after=None):
+    """
+    A page of the files whose name contains q, newest first, starting after the
+    file id after. Returns the page, the id to continue from (None on the last
+    page) and the number of matches, counted up to FILE_SEARCH_COUNT_LIMIT + 1 (so
+    a count over the limit means there are more than the limit).
+
+    The name__icontains filter is served by the files_enginedatafile_name_trgm
+    index and the pages are keyset paginated, so a page costs the same at any
+    depth of any table size.
+    """
+    edfs = EngineDataFile.objects.filter(name__icontains=q)
+    count = edfs[:FILE_SEARCH_COUNT_LIMIT + 1].count()
+
+    if after is not None:
+        edfs = edfs.filter(id__lt=after)
+    edfs = edfs.select_related('aircraft', 'user').order_by('-id')[:FILE_SEARCH_PAGE_SIZE]
+
+    next_after = None
+    if len(edfs) == FILE_SEARCH_PAGE_SIZE:
+        next_after = edfs[FILE_SEARCH_PAGE_SIZE - 1].id
+    return edfs, next_after, count
+
+
+def _aircraft_search_candidates(search_term):
+    """
+    Ids of the aircraft with a field of AIRCRAFT_SEARCH_FIELDS starting with
+    search_term, as a UNION of one lookup per field, each of which can use the
+    field's prefix index (an OR across the joined tables cannot).
+    """
+    matches = [Aircraft.objects.filter(**{field + '__istartswith': search_term}).order_by().values('id')
+               for field in AIRCRAFT_SEARCH_FIELDS]
+    return matches[0].union(*matches[1:])
+
+
+def _aircraft_cursor(airplane):
+    # The sort key of airplane, so a page continues from it even once it is gone
+    if airplane.registration_no is None:
+        return str(airplane.id)
+    return '{}:{}'.format(airplane.id, airplane.registration_no)
+
+
+def _parse_aircraft_cursor(after):
+    last_id, separator, registration_no = after.partition(':')
+    return (registration_no if separator else None), int(last_id)
+
+
+def search_aircraft(search_term, after=None):
+    """
+    A page of the owned aircraft with a field of AIRCRAFT_SEARCH_FIELDS starting
+    with search_term, ordered by tail number (aircraft without one last), starting
+    after the cursor after. Returns the page and the cursor of the next page (None
+    on the last page). Raises ValueError when after is not a cursor.
+
+    Every aircraft of the page gets its flight count as flight_total, read from
+    its AircraftFlightStats.
+    """
+    aircraft = Aircraft.objects.filter(id__in=_aircraft_search_candidates(search_term), user__isnull=False) \
+        .order_by(F('registration_no').asc(nulls_last=True), 'id')
+
+    if after is not None:
+        registration_no, last_id = _parse_aircraft_cursor(after)
+        if registration_no is None:
+            aircraft = aircraft.filter(registration_no__isnull=True, id__gt=last_id)
+        else:
+            aircraft = aircraft.filter(Q(registration_no__gt=registration_no) |
+                                       Q(registration_no=registration_no, id__gt=last_id) |
+                                       Q(registration_no__isnull=True))
+
+    aircraft = list(aircraft.select_related('user', 'aircraft_manufacturer', 'aircraft_model',
+                                            'engine_manufacturer', 'engine_model',
+                                            'flight_stats')[:AIRCRAFT_SEARCH_PAGE_SIZE])
+
+    for airplane in aircraft:
+        try:
+            airplane.flight_total = airplane.flight_stats.flight_count
+        except AircraftFlightStats.DoesNotExist:
+            airplane.flight_total = 0
+
+    next_after = _aircraft_cursor(aircraft[-1]) if len(aircraft) == AIRCRAFT_SEARCH_PAGE_SIZE else None
+    return aircraft, next_after
+
+
+def subscribed_aircraft_ids(aircraft, entitlements=None):
+    """Ids of those of aircraft with a subscription running now."""
+    if entitlements is None:
+        entitlements = Entitlements()
+    entitlements.load(aircraft_ids=[airplane.id for airplane in aircraft])
+    return {airplane.id for airplane in aircraft if entitlements.current_subscription(airplane) is not None}
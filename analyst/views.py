@@ -3,12 +3,13 @@ import time
 
 # Django
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required
 from django.urls import reverse, reverse_lazy
 from django.conf import settings
 from django.utils import timezone
+from django.utils.html import escape
 from django.views.generic import FormView
 
 # Third-party
@@ -30,8 +31,9 @@ from main.helpspot import ticket_for_user
 from files.models import (
     EngineDataFile,
 )
+from aircraft.entitlements import entitlements_for
 from aircraft.models import Aircraft
-from analyst.models import FlightReport, FlightReportClipboadEntry
+from analyst.models import HEADLINE_START, HEADLINE_STOP, TEXT_FIELDS, FlightReport, FlightReportClipboadEntry
 from analyst.forms import (
     PostReportAndUserForm,
     FlightForm,
@@ -40,7 +42,9 @@ from analyst.forms import (
     ClientNotesForm,
     FlightReportSearchForm
 )
-from analyst.reports import PdfReport
+from analyst.reports import HtmlReport, PdfReport
+from analyst.utils import (FILE_SEARCH_COUNT_LIMIT, report_pdf_response, search_aircraft, search_engine_data_files,
+                           subscribed_aircraft_ids)
 
 # TODO: Suspect imports - rethink location of code
 from aircraft.forms import AnalystNotesForm
@@ -51,6 +55,9 @@ from tickets.utils import (send_report,
                            attach_file,
                            get_ticket_time)
 
+# Most reports a full-text search returns
+REPORT_SEARCH_RESULTS = 50
+
 
 @login_required
 @permission_required('global_permission.view_user_data', login_url=reverse_lazy('permissions-error'))
@@ -58,11 +65,59 @@ def analyst_file_search(request):
     if request.is_ajax():
         q = request.POST.get('filename', '')
         if q:
-            edfs = EngineDataFile.objects.prefetch_related('aircraft', 'user').filter(name__icontains=q)
-            return render(request, 'analyst/_file-list.html', { 'edfs': edfs })
+            after = request.POST.get('after')
+            edfs, next_after, count = search_engine_data_files(q, int(after) if after and after.isdigit() else None)
+            return render(request, 'analyst/_file-list.html', {'edfs': edfs, 'next_after': next_after,
+                                                               'count': count,
+                                                               'count_limit': FILE_SEARCH_COUNT_LIMIT})
     return render(request, 'analyst/file-search.html', {})
 
 
+@login_required
+@permission_required('global_permission.view_user_data', login_url=reverse_lazy('permissions-error'))
+def analyst_aircraft_search(request):
+    if request.is_ajax():
+        search_term = request.POST.get('search_term', '').strip()
+        aircraft, next_after = [], None
+        if search_term:
+            try:
+                aircraft, next_after = search_aircraft(search_term, request.POST.get('after') or None)
+            except ValueError:
+                return HttpResponseBadRequest('Invalid page.')
+
+        mx_aircraft_ids = {mx_aircraft.id for mx_aircraft, _ in get_all_mx_aircraft_and_owners()}
+        for airplane in aircraft:
+            airplane.mx = airplane.id in mx_aircraft_ids
+
+        return render(request, 'analyst/_aircraft-list.html', {'aircraft': aircraft,
+                                                               'subscriptions': subscribed_aircraft_ids(aircraft, entitlements_for(request)),
+                                                               'next_after': next_after})
+    return render(request, 'analyst/aircraft-search.html', {'search_term': request.GET.get('search', '')})
+
+
+def _snippet_html(snippet):
+    # The analyst text is escaped, only the match highlights are markup
+    return escape(snippet).replace(HEADLINE_START, '<b>').replace(HEADLINE_STOP, '</b>')
+
+
+@login_required
+@permission_required('global_permission.view_user_data', login_url=reverse_lazy('permissions-error'))
+def flight_report_text_search(request):
+    q = request.GET.get('q', '').strip()
+    results = []
+    if q:
+        flight_reports = FlightReport.objects.listing().search(q)[:REPORT_SEARCH_RESULTS]
+        results = [{
+            'id': report.id,
+            'ticket_id': report.ticket_id,
+            'flight_id': report.flight_id,
+            'created_on': report.created_on,
+            'rank': report.rank,
+            'snippet': _snippet_html(report.snippet),
+        } for report in flight_reports]
+    return JsonResponse({'results': results})
+
+
 @login_required
 def download_edf(request, edf_id):
     if request.user.has_perm('global_permission.download_flight_data'):
@@ -98,8 +153,7 @@ def generate_report(request, ticket_id, flight_id):
     _, history, _ = get_ticket_history(ticket_id)
 
     # Check that there are no existing reports for this ticket and flight
-    existing_reports = FlightReport.objects.filter(ticket_id=ticket.id, flight_id=flight_id)
-    if len(existing_reports) > 0:
+    if FlightReport.objects.filter(ticket_id=ticket.id, flight_id=flight_id).exists():
         return render(request, 'skeletons/basic.html',
                       {'title': "Error", 'text': 'A report already exists for this ticket/flight combination.'})
 
@@ -121,7 +175,10 @@ def generate_report(request, ticket_id, flight_id):
 
     # Get the report to paste, a mismatch (single/twin) or nothing
     try:
-        paste_report_instance = FlightReportClipboadEntry.objects.get(user=request.user).report
+        paste_report_instance = FlightReportClipboadEntry.objects \
+            .select_related('report__flight__aircraft__aircraft_model') \
+            .defer(*['report__' + field for field in TEXT_FIELDS]) \
+            .get(user=request.user).report
         source_is_twin = paste_report_instance.flight.aircraft.aircraft_model.twin
         target_is_twin = context['aircraft'].aircraft_model.twin
         if source_is_twin == target_is_twin:
@@ -211,3 +268,40 @@ def generate_report(request, ticket_id, flight_id):
 
     return render(request, 'analyst/report-form.html', context)
 
+
+@login_required
+@permission_required('global_permission.view_sa_reports', login_url=reverse_lazy('permissions-error'))
+def preview_report_html(request, ticket_id, flight_id):
+    flight_reports = FlightReport.objects.filter(ticket_id=ticket_id, flight_id=flight_id).with_content().order_by('engine')
+    # The client comments of the PDF come from the ticket
+    return HtmlReport(flight_reports, get_ticket_body(ticket_id), entitlements=entitlements_for(request)).generate()
+
+
+@login_required
+@permission_required('global_permission.view_mx_reports', login_url=reverse_lazy('permissions-error'))
+def preview_report_mx_html(request, flight_id):
+    flight_reports = FlightReport.objects.filter(flight_id=flight_id).with_content().order_by('engine')
+    ticket_id = flight_reports.values_list('ticket_id', flat=True).first()
+    ticket_body = get_ticket_body(ticket_id) if ticket_id is not None else None
+    return HtmlReport(flight_reports, ticket_body, entitlements=entitlements_for(request)).generate()
+
+
+@login_required
+@permission_required('global_permission.view_sa_reports', login_url=reverse_lazy('permissions-error'))
+def download_report(request, ticket_id, flight_id, attachment):
+    if not TicketRequest.objects.filter(id=ticket_id, trash=0).exists():
+        return render(request, 'tickets/ticket_not_public.html')
+
+    # Also the PDF the report preview embeds (attachment 0), so previews are served
+    # from the stored PDF too until the report changes
+    flight_reports = FlightReport.objects.filter(ticket_id=ticket_id, flight_id=flight_id).with_content()
+    return report_pdf_response(flight_reports, get_ticket_body(ticket_id), attachment, entitlements_for(request))
+
+
+@login_required
+@permission_required('global_permission.view_mx_reports', login_url=reverse_lazy('permissions-error'))
+def download_report_mx(request, flight_id, attachment):
+    flight_reports = FlightReport.objects.filter(flight_id=flight_id).with_content()
+    ticket_id = flight_reports.values_list('ticket_id', flat=True).first()
+    ticket_body = get_ticket_body(ticket_id) if ticket_id is not None else None
+    return report_pdf_response(flight_reports, ticket_body, attachment, entitlements_for(request))